@@ -0,0 +1,422 @@
+"""HTTP inference API for RIS integrations (requires starlette and uvicorn).
+
+    POST /v1/analyze                body: one DICOM instance (application/dicom)  ->  report JSON
+    GET  /v1/health                 model version
+    POST /dicomweb/studies[/{uid}]  DICOMweb STOW-RS: multipart/related instances, analyzed in the background
+    GET  /v1/instances/{uid}        analysis status and report of an instance received over STOW-RS
+
+The report is the same ``report_data`` the Home page shows. Requests are
+decoded with processing.ImageProcessor on a thread pool and predicted on
+the shared batching engine, so concurrent requests are micro-batched
+together, and repeats are answered from the prediction cache.
+
+Run it standalone with ``python api.py [--host 127.0.0.1] [--port 8502]``, or
+set PULMOVISTA_API_PORT to have the Streamlit app serve it from its own
+process, sharing one model, batcher and cache between the UI and the API.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from imaging import DECODE_THREADS, SPOOL_CHUNK_BYTES, SPOOL_DIR, remove_quietly
+from inference import MODEL_VERSION, create_engine
+from prediction_cache import PredictionCache
+from processing import ImageLoadError, ImageProcessor, ImageRejected, StudyAnalysis
+
+API_HOST = os.environ.get("PULMOVISTA_API_HOST", "127.0.0.1")
+# Port the Streamlit app serves the API on; unset or 0 leaves it off
+API_PORT = int(os.environ.get("PULMOVISTA_API_PORT", "0") or 0)
+MAX_BODY_BYTES = int(float(os.environ.get("PULMOVISTA_API_MAX_BODY_MB", "200")) * 1024 * 1024)
+# Request bodies are kept in memory up to this size and spooled to disk beyond it
+BODY_MEMORY_BYTES = 1 << 20
+DICOM_CONTENT_TYPES = ("application/dicom", "application/octet-stream")
+# STOW-RS instances waiting for analysis; uploads wait (TCP back-pressure) while the queue is full
+ANALYSIS_QUEUE_SIZE = int(os.environ.get("PULMOVISTA_API_QUEUE_SIZE", "64"))
+# Analysis results of STOW-RS instances kept for polling
+RESULT_ENTRIES = int(os.environ.get("PULMOVISTA_API_RESULT_ENTRIES", "10000"))
+MAX_PART_HEADER_BYTES = 16 * 1024
+# PS3.18 store failure reasons
+FAILURE_CANNOT_UNDERSTAND = 0xC000
+FAILURE_OUT_OF_RESOURCES = 0xA700
+
+
+class PayloadTooLarge(ValueError):
+    """The request body exceeds PULMOVISTA_API_MAX_BODY_MB"""
+
+
+class AnalysisService:
+    """Decodes API uploads on a thread pool and predicts them on a shared engine"""
+
+    def __init__(self, engine, cache=None, decode_threads=DECODE_THREADS):
+        self.engine = engine
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=decode_threads, thread_name_prefix="api-decode")
+
+    def prepare(self, source, start_time):
+        """Decode one instance and look it up in the prediction cache (runs on the decode pool)"""
+        decoded = ImageProcessor.load(source, previews=False, dicom=True)
+        return StudyAnalysis(decoded, self.cache, start_time)
+
+    async def analyze(self, source):
+        """Report data for one DICOM instance read from ``source``"""
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(self.executor, self.prepare, source, start_time)
+        # Multi-frame studies stream their frames on the decode pool
+        probabilities = await asyncio.wrap_future(analysis.submit(self.engine, self.executor))
+        if analysis.hit:
+            return analysis.report()
+        # Caching the new prediction writes to disk
+        return await loop.run_in_executor(self.executor, analysis.report, probabilities)
+
+
+async def spool_body(request, max_bytes=MAX_BODY_BYTES):
+    """Read the request body as it arrives into a temp file, spilling to disk past BODY_MEMORY_BYTES"""
+    body = tempfile.SpooledTemporaryFile(max_size=BODY_MEMORY_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            body.close()
+            raise PayloadTooLarge(f"Request body exceeds {max_bytes // (1024 * 1024)} MB")
+        body.write(chunk)
+    body.seek(0)
+    return body
+
+
+def parse_content_type(value):
+    """('multipart/related', {'boundary': ..., 'type': ...}) from a Content-Type header"""
+    media_type, *params = value.split(';')
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition('=')
+        parsed[key.strip().lower()] = param_value.strip().strip('"')
+    return media_type.strip().lower(), parsed
+
+
+class MultipartRelatedParser:
+    """Incremental multipart/related parser that writes every part to its own spool file.
+
+    feed() takes body chunks as they arrive and returns the parts they
+    completed as (headers, path) pairs. Only a delimiter's worth of bytes is
+    held back between calls, so memory does not depend on part or request
+    size. The caller owns the returned files.
+    """
+
+    def __init__(self, boundary, directory=SPOOL_DIR):
+        self.delimiter = b"\r\n--" + boundary
+        # A leading CRLF lets the first delimiter match like every later one
+        self.buffer = b"\r\n"
+        self.state = 'preamble'
+        self.directory = directory
+        self.part = None
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+        while True:
+            if self.state in ('preamble', 'body'):
+                index = self.buffer.find(self.delimiter)
+                if index < 0:
+                    keep = len(self.delimiter) - 1
+                    if len(self.buffer) > keep:
+                        if self.state == 'body':
+                            self.part[2].write(self.buffer[:-keep])
+                        self.buffer = self.buffer[-keep:]
+                    return completed
+                if self.state == 'body':
+                    self.part[2].write(self.buffer[:index])
+                    completed.append(self._finish_part())
+                self.buffer = self.buffer[index + len(self.delimiter):]
+                self.state = 'delimiter'
+            elif self.state == 'delimiter':
+                # "--" closes the body; otherwise the rest of the line (transport padding) ends with CRLF
+                if len(self.buffer) < 2:
+                    return completed
+                if self.buffer.startswith(b"--"):
+                    self.state, self.buffer = 'epilogue', b""
+                    return completed
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    if len(self.buffer) > MAX_PART_HEADER_BYTES:
+                        raise ValueError("Malformed multipart boundary line")
+                    return completed
+                self.buffer = self.buffer[end + 2:]
+                self.state = 'headers'
+            elif self.state == 'headers':
+                if self.buffer.startswith(b"\r\n"):
+                    end, header_bytes = 0, b""
+                else:
+                    end = self.buffer.find(b"\r\n\r\n")
+                    if end < 0:
+                        if len(self.buffer) > MAX_PART_HEADER_BYTES:
+                            raise ValueError("Multipart part headers are too large")
+                        return completed
+                    header_bytes, end = self.buffer[:end], end + 2
+                headers = {}
+                for line in header_bytes.decode('latin-1').split("\r\n"):
+                    name, _, value = line.partition(':')
+                    if name.strip():
+                        headers[name.strip().lower()] = value.strip()
+                self.buffer = self.buffer[end + 2:]
+                fd, path = tempfile.mkstemp(prefix="stow-", suffix=".dcm", dir=self.directory)
+                self.part = (headers, path, os.fdopen(fd, 'wb'))
+                self.state = 'body'
+            else:
+                # Epilogue: ignored
+                self.buffer = b""
+                return completed
+
+    def _finish_part(self):
+        headers, path, spool = self.part
+        spool.close()
+        self.part = None
+        return headers, path
+
+    def close(self):
+        """Check the body ended with the closing delimiter"""
+        if self.state != 'epilogue':
+            self.abort()
+            raise ValueError("Multipart body ended before its closing boundary")
+
+    def abort(self):
+        """Remove the part being written, e.g. when the client disconnects"""
+        if self.part is not None:
+            self.part[2].close()
+            remove_quietly(self.part[1])
+            self.part = None
+
+
+def read_instance_header(path):
+    """SOP Class, SOP Instance and Study Instance UIDs of a spooled instance"""
+    import pydicom
+
+    header = pydicom.dcmread(path, stop_before_pixels=True)
+    return str(header.SOPClassUID), str(header.SOPInstanceUID), str(getattr(header, 'StudyInstanceUID', ''))
+
+
+class AnalysisQueue:
+    """Spooled instances analyzed by background tasks, with results kept for polling by SOP Instance UID"""
+
+    def __init__(self, service, maxsize=ANALYSIS_QUEUE_SIZE, workers=DECODE_THREADS,
+                 result_entries=RESULT_ENTRIES):
+        self.service = service
+        self.maxsize = maxsize
+        self.workers = workers
+        self.result_entries = result_entries
+        self.results = OrderedDict()
+        self.queue = None
+        self.tasks = []
+
+    async def start(self):
+        self.queue = asyncio.Queue(self.maxsize)
+        self.tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        while not self.queue.empty():
+            remove_quietly(self.queue.get_nowait()[1])
+
+    async def put(self, sop_instance_uid, path):
+        """Queue a spooled instance, waiting while the queue is full; the queue removes the file when done"""
+        self._record(sop_instance_uid, {'status': 'queued'})
+        await self.queue.put((sop_instance_uid, path))
+
+    def get(self, sop_instance_uid):
+        return self.results.get(sop_instance_uid)
+
+    def _record(self, sop_instance_uid, result):
+        self.results[sop_instance_uid] = dict(result, sop_instance_uid=sop_instance_uid)
+        self.results.move_to_end(sop_instance_uid)
+        while len(self.results) > self.result_entries:
+            self.results.popitem(last=False)
+
+    async def _work(self):
+        while True:
+            sop_instance_uid, path = await self.queue.get()
+            try:
+                result = {'status': 'done', 'report': await self.service.analyze(path)}
+            except ImageRejected as e:
+                result = {'status': 'skipped', 'error': str(e)}
+            except Exception as e:
+                result = {'status': 'failed', 'error': str(e)}
+            finally:
+                remove_quietly(path)
+                self.queue.task_done()
+            self._record(sop_instance_uid, result)
+
+
+def store_response(stored, failed):
+    """PS3.18 store instances response (application/dicom+json) and its status code"""
+    response = {}
+    if stored:
+        response['00081199'] = {'vr': 'SQ', 'Value': [
+            {'00081150': {'vr': 'UI', 'Value': [sop_class]}, '00081155': {'vr': 'UI', 'Value': [sop_instance]}}
+            for sop_class, sop_instance in stored
+        ]}
+    if failed:
+        items = []
+        for sop_class, sop_instance, reason in failed:
+            item = {'00081197': {'vr': 'US', 'Value': [reason]}}
+            if sop_class:
+                item['00081150'] = {'vr': 'UI', 'Value': [sop_class]}
+            if sop_instance:
+                item['00081155'] = {'vr': 'UI', 'Value': [sop_instance]}
+            items.append(item)
+        response['00081198'] = {'vr': 'SQ', 'Value': items}
+    status_code = 200 if not failed else 202 if stored else 409
+    return JSONResponse(response, status_code=status_code, media_type="application/dicom+json")
+
+
+def error_response(status_code, message):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+
+def create_app(engine, cache=None):
+    """Starlette app serving the API on ``engine`` (an InferenceEngine or InferenceWorkerPool)"""
+    service = AnalysisService(engine, cache)
+    analysis_queue = AnalysisQueue(service)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await analysis_queue.start()
+        yield
+        await analysis_queue.stop()
+
+    async def analyze(request):
+        content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type not in DICOM_CONTENT_TYPES:
+            return error_response(415, f"Expected a DICOM body ({' or '.join(DICOM_CONTENT_TYPES)})")
+        try:
+            body = await spool_body(request)
+        except PayloadTooLarge as e:
+            return error_response(413, str(e))
+        try:
+            return JSONResponse(await service.analyze(body))
+        except ImageRejected as e:
+            return error_response(422, str(e))
+        except ImageLoadError as e:
+            return error_response(400, str(e))
+        except Exception as e:
+            return error_response(500, f"Error running AI analysis: {str(e)}")
+        finally:
+            body.close()
+
+    async def health(request):
+        return JSONResponse({'status': 'ok', 'model': MODEL_VERSION})
+
+    async def store_instances(request):
+        media_type, params = parse_content_type(request.headers.get('content-type', ''))
+        if media_type != 'multipart/related' or not params.get('boundary'):
+            return error_response(415, "Expected multipart/related with a boundary")
+        if params.get('type', 'application/dicom').lower() != 'application/dicom':
+            return error_response(415, "Only application/dicom instances are supported")
+
+        study_uid = request.path_params.get('study')
+        loop = asyncio.get_running_loop()
+        parser = MultipartRelatedParser(params['boundary'].encode('latin-1'))
+        stored, failed = [], []
+
+        async def store(headers, path):
+            part_type = parse_content_type(headers.get('content-type', 'application/dicom'))[0]
+            try:
+                if part_type != 'application/dicom':
+                    raise ValueError(f"Unsupported part type {part_type}")
+                sop_class, sop_instance, instance_study = await loop.run_in_executor(
+                    service.executor, read_instance_header, path)
+            except Exception:
+                remove_quietly(path)
+                failed.append((None, None, FAILURE_CANNOT_UNDERSTAND))
+                return
+            if study_uid and instance_study != study_uid:
+                remove_quietly(path)
+                failed.append((sop_class, sop_instance, FAILURE_CANNOT_UNDERSTAND))
+                return
+            await analysis_queue.put(sop_instance, path)
+            stored.append((sop_class, sop_instance))
+
+        async def feed(chunks):
+            # Spool writes block, so they run off the event loop, a SPOOL_CHUNK_BYTES batch at a time
+            for headers, path in await run_in_threadpool(parser.feed, b"".join(chunks)):
+                await store(headers, path)
+
+        try:
+            chunks, size = [], 0
+            async for chunk in request.stream():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= SPOOL_CHUNK_BYTES:
+                    await feed(chunks)
+                    chunks, size = [], 0
+            await feed(chunks)
+            parser.close()
+        except ValueError as e:
+            if not stored and not failed:
+                return error_response(400, str(e))
+            # Earlier parts are already queued: report them, and the rest of the body as not understood
+            failed.append((None, None, FAILURE_CANNOT_UNDERSTAND))
+        except OSError:
+            failed.append((None, None, FAILURE_OUT_OF_RESOURCES))
+        finally:
+            parser.abort()
+        return store_response(stored, failed)
+
+    async def instance_result(request):
+        result = analysis_queue.get(request.path_params['uid'])
+        if result is None:
+            return error_response(404, "Unknown instance")
+        return JSONResponse(result, status_code=200 if result['status'] != 'queued' else 202)
+
+    app = Starlette(routes=[
+        Route('/v1/analyze', analyze, methods=['POST']),
+        Route('/v1/health', health, methods=['GET']),
+        Route('/v1/instances/{uid}', instance_result, methods=['GET']),
+        Route('/dicomweb/studies', store_instances, methods=['POST']),
+        Route('/dicomweb/studies/{study}', store_instances, methods=['POST']),
+    ], lifespan=lifespan)
+    app.state.service = service
+    app.state.analysis_queue = analysis_queue
+    return app
+
+
+def serve_in_background(engine, cache=None, host=API_HOST, port=API_PORT):
+    """Run the API on a daemon thread of this process; returns the uvicorn.Server once it is listening"""
+    server = uvicorn.Server(uvicorn.Config(create_app(engine, cache), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="inference-api", daemon=True)
+    thread.start()
+    while not server.started and thread.is_alive():
+        time.sleep(0.01)
+    if not server.started:
+        raise RuntimeError(f"Inference API could not start on {host}:{port}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the PulmoVista model over HTTP")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT or 8502)
+    args = parser.parse_args()
+
+    engine = create_engine()
+    try:
+        uvicorn.run(create_app(engine, PredictionCache()), host=args.host, port=args.port)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
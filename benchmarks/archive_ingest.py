@@ -0,0 +1,118 @@
+"""Peak memory of streaming ZIP ingest as the archive grows.
+
+Writes ZIP archives of synthetic 12-bit chest studies to a temp directory
+(deflated, as referring sites send them), then ingests each one the way the
+batch path does: list entries from the central directory, screen each
+header straight from the decompressing stream, spool accepted entries,
+decode, window and preprocess, with a bounded number of studies in flight.
+tracemalloc records the peak of everything allocated during ingest.
+
+Peak memory should stay flat while the archive size grows.
+
+    python -m benchmarks.archive_ingest [--studies 8 32 128] [--size 1024] [--in-flight 8]
+"""
+import argparse
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from imaging import DECODE_THREADS, DECODERS, read_spooled_dicom, window_to_uint8  # noqa: E402
+from ingest import list_entries  # noqa: E402
+from inference import preprocess  # noqa: E402
+
+
+def study_bytes(size, seed):
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    meta = FileMetaDataset()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.1.1"  # Digital X-Ray Image Storage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds = FileDataset(None, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID, ds.SOPInstanceUID = meta.MediaStorageSOPClassUID, meta.MediaStorageSOPInstanceUID
+    ds.Modality, ds.BodyPartExamined = "DX", "CHEST"
+    ds.Rows = ds.Columns = size
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 12, 11, 0
+    ds.WindowCenter, ds.WindowWidth = 2048, 4096
+    ds.PixelData = np.random.default_rng(seed).integers(0, 4096, size=(size, size), dtype=np.uint16).tobytes()
+    buffer = io.BytesIO()
+    ds.save_as(buffer, enforce_file_format=True)
+    return buffer.getvalue()
+
+
+def write_archive(path, studies, size):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for index in range(studies):
+            archive.writestr(f"study/IM{index:05d}", study_bytes(size, index))
+        archive.writestr("study/README.txt", "not a study")
+
+
+def ingest_entry(entry):
+    import pydicom
+
+    with entry.open() as stream:
+        try:
+            pydicom.dcmread(stream, stop_before_pixels=True)
+        except pydicom.errors.InvalidDicomError:
+            return None
+        ds = read_spooled_dicom(stream, defer_size="64 KB")
+    return preprocess(Image.fromarray(window_to_uint8(DECODERS.decode(ds), ds)))
+
+
+def ingest(path, in_flight_limit):
+    entries = iter(list_entries(path))
+    accepted = 0
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=DECODE_THREADS) as pool:
+        while True:
+            for entry in itertools.islice(entries, max(0, in_flight_limit - len(in_flight))):
+                in_flight.add(pool.submit(ingest_entry, entry))
+            if not in_flight:
+                return accepted
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            accepted += sum(1 for future in done if future.result() is not None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", nargs="+", type=int, default=[8, 32, 128])
+    parser.add_argument("--size", type=int, default=1024, help="Study rows and columns")
+    parser.add_argument("--in-flight", type=int, default=2 * DECODE_THREADS)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} studies, {args.in_flight} in flight")
+    print(f"{'studies':>8} {'archive MB':>11} {'raw MB':>8} {'peak MB':>8} {'studies/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for studies in args.studies:
+            path = os.path.join(directory, f"{studies}.zip")
+            write_archive(path, studies, args.size)
+            tracemalloc.start()
+            start = time.perf_counter()
+            accepted = ingest(path, args.in_flight)
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert accepted == studies
+            raw = studies * args.size * args.size * 2
+            print(f"{studies:>8} {os.path.getsize(path) / 2 ** 20:>11.1f} {raw / 2 ** 20:>8.1f} "
+                  f"{peak / 2 ** 20:>8.1f} {studies / seconds:>10.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
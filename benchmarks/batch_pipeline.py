@@ -0,0 +1,103 @@
+"""Measure batch scoring throughput and model utilization at several levels of decode parallelism.
+
+Writes synthetic DICOM chest studies to a temp folder and scores them with
+score_studies.score() for every combination of decode workers and prefetch
+depth. Throughput and utilization (the share of wall time spent inside the
+model) are taken between the first and the last record, so the start-up of
+the worker processes is left out. Prefetch 0 stacks each batch in the main
+thread between model calls, as a pipeline without prefetch would.
+
+By default the model is a stand-in that sleeps --model-ms per batch (like
+an accelerator, it releases the GIL); pass --model to run a real one.
+
+    python -m benchmarks.batch_pipeline [--studies 400] [--workers 1 2 4 8] [--prefetch 0 2] [--model model.h5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.http_load import study_template  # noqa: E402
+from inference import InferenceEngine, load_model  # noqa: E402
+from ingest import list_entries  # noqa: E402
+from score_studies import score  # noqa: E402
+
+
+class TimedWriter:
+    """Stands in for ResultWriter and notes when the first and last records arrive"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.first = self.last = None
+        self.busy_at_first = 0.0
+
+    def write(self, record):
+        self.count += 1
+        self.last = time.perf_counter()
+        if self.first is None:
+            self.first = self.last
+            self.busy_at_first = self.engine.busy_seconds
+
+
+def write_studies(directory, template, count):
+    for number in range(count):
+        body = bytearray(template)
+        # Distinct last pixels, as real studies would differ
+        body[-4:] = np.array([number & 0xFFF, (number >> 12) & 0xFFF], dtype="<u2").tobytes()
+        with open(os.path.join(directory, f"study-{number:05d}.dcm"), 'wb') as f:
+            f.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", type=int, default=400)
+    parser.add_argument("--size", type=int, default=1024, help="Study rows and columns")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8], help="Decode worker processes")
+    parser.add_argument("--prefetch", nargs="+", type=int, default=[0, 2], help="Batches prepared ahead")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model-ms", type=float, default=40.0, help="Stand-in model time per batch")
+    parser.add_argument("--model", help="Run a real model instead of the stand-in")
+    args = parser.parse_args()
+
+    if args.model:
+        model = load_model(args.model, [1, 2, 4, 8, args.batch_size])
+    else:
+        def model(batch):
+            time.sleep(args.model_ms / 1000)
+            return np.full((len(batch), 3), 1 / 3, dtype=np.float32)
+
+    directory = tempfile.mkdtemp(prefix="batch-pipeline-")
+    try:
+        template = study_template(args.size)
+        write_studies(directory, template, args.studies)
+        entries = list_entries(directory)
+        print(f"{args.studies} studies of {args.size}x{args.size} ({len(template) / 2 ** 20:.1f} MB), "
+              f"batches of {args.batch_size}" + ("" if args.model else f", stand-in model {args.model_ms:.0f} ms/batch"))
+        print(f"{'workers':>7} {'prefetch':>8} {'studies/s':>10} {'model util':>10} {'batch fill':>10}")
+        for workers in args.workers:
+            for prefetch_batches in args.prefetch:
+                engine = InferenceEngine(model, max_batch_size=args.batch_size)
+                writer = TimedWriter(engine)
+                try:
+                    score(entries, writer, workers, 4 * workers, engine, batch_size=args.batch_size,
+                          prefetch_batches=prefetch_batches, report_every=args.studies + 1)
+                finally:
+                    engine.close()
+                window = max(writer.last - writer.first, 1e-6)
+                utilization = (engine.busy_seconds - writer.busy_at_first) / window
+                print(f"{workers:>7} {prefetch_batches:>8} {(writer.count - 1) / window:>10.1f} "
+                      f"{utilization:>10.0%} {engine.images_run / max(engine.batches_run, 1):>10.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Send thousands of instances to the C-STORE receiver from a local SCU and measure throughput.
+
+Starts store_scp.py on a free local port in this process (or targets --host
+and --port) and sends synthetic DICOM chest instances over several
+associations at once. Reports the send rate, C-STORE response latency
+(which grows when the queue is full and back-pressure kicks in), the
+queue's high-water mark, and how long it takes until everything is analyzed.
+
+By default the model is a stand-in that returns constant probabilities; pass
+--model to include a real one.
+
+    python -m benchmarks.cstore_load [--instances 2000] [--associations 4] [--size 512] [--model model.h5]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.http_load import percentile, study_template  # noqa: E402
+from inference import InferenceEngine, load_model  # noqa: E402
+
+STUDY_UID = "1.2.826.0.1.3680043.8.498.2"
+
+
+def send(host, port, ae_title, template, numbers):
+    """Send ``numbers`` instances over one association; returns (latencies in ms, statuses)"""
+    import pydicom
+    from pynetdicom import AE
+
+    ds = pydicom.dcmread(io.BytesIO(template))
+    ds.StudyInstanceUID = STUDY_UID
+    pixels = bytearray(ds.PixelData)
+    ae = AE(ae_title="CSTORE-LOAD")
+    ae.add_requested_context(ds.SOPClassUID, ds.file_meta.TransferSyntaxUID)
+    assoc = ae.associate(host, port, ae_title=ae_title)
+    if not assoc.is_established:
+        raise RuntimeError(f"Association with {ae_title}@{host}:{port} was not established")
+    latencies, statuses = [], {}
+    try:
+        for number in numbers:
+            ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = f"{STUDY_UID}.{number}"
+            # Distinct 12-bit values in the last two pixels so no instance is answered from the cache
+            pixels[-4:] = np.array([number & 0xFFF, (number >> 12) & 0xFFF], dtype="<u2").tobytes()
+            ds.PixelData = bytes(pixels)
+            start = time.perf_counter()
+            status = assoc.send_c_store(ds)
+            latencies.append((time.perf_counter() - start) * 1000)
+            code = f"0x{status.Status:04X}" if status else "no response"
+            statuses[code] = statuses.get(code, 0) + 1
+    finally:
+        assoc.release()
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=2000)
+    parser.add_argument("--associations", type=int, default=4, help="Concurrent SCU associations")
+    parser.add_argument("--size", type=int, default=512, help="Instance rows and columns")
+    parser.add_argument("--queue-size", type=int, help="Receiver queue size (default: PULMOVISTA_SCP_QUEUE_SIZE)")
+    parser.add_argument("--model", help="Run a real model instead of the constant stand-in")
+    parser.add_argument("--host", help="Target a running receiver instead")
+    parser.add_argument("--port", type=int, default=11112)
+    parser.add_argument("--ae-title", default="PULMOVISTA")
+    args = parser.parse_args()
+
+    scp = engine = None
+    host, port = args.host, args.port
+    if host is None:
+        from prediction_cache import PredictionCache
+        from store_scp import StoreSCP
+
+        if args.model:
+            model = load_model(args.model, [1, 2, 4, 8])
+        else:
+            def model(batch):
+                return np.full((len(batch), 3), 1 / 3, dtype=np.float32)
+        engine = InferenceEngine(model)
+        cache = PredictionCache(cache_dir=tempfile.mkdtemp(prefix="cstore-load-cache-"))
+        options = {'maxsize': args.queue_size} if args.queue_size else {}
+        scp = StoreSCP(engine, cache, ae_title=args.ae_title, **options).start("127.0.0.1", 0)
+        host, port = "127.0.0.1", scp.port
+
+    template = study_template(args.size)
+    numbers = list(range(1, args.instances + 1))
+    batches = [numbers[i::args.associations] for i in range(args.associations)]
+    total_mb = len(template) * args.instances / 2 ** 20
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.associations) as pool:
+        results = list(pool.map(lambda batch: send(host, port, args.ae_title, template, batch), batches))
+    send_seconds = time.perf_counter() - start
+    if scp is not None:
+        scp.queue.join()
+    total_seconds = time.perf_counter() - start
+
+    latencies = sorted(ms for batch_latencies, _ in results for ms in batch_latencies)
+    statuses = {}
+    for _, batch_statuses in results:
+        for code, count in batch_statuses.items():
+            statuses[code] = statuses.get(code, 0) + count
+    print(f"{args.instances} instances of {len(template) / 2 ** 20:.1f} MB ({total_mb:.0f} MB) "
+          f"over {args.associations} associations; C-STORE statuses {statuses}")
+    print(f"sent in {send_seconds:.1f} s ({args.instances / send_seconds:.1f} instances/s, "
+          f"{total_mb / send_seconds:.0f} MB/s); C-STORE ms p50 {percentile(latencies, 50):.1f} "
+          f"p90 {percentile(latencies, 90):.1f} p99 {percentile(latencies, 99):.1f} max {latencies[-1]:.1f}")
+    if scp is not None:
+        outcomes = {}
+        for result in scp.queue.results.values():
+            outcomes[result['status']] = outcomes.get(result['status'], 0) + 1
+        print(f"queue high-water mark {scp.queue.high_water}/{scp.queue.queue.maxsize}; all analyzed after "
+              f"{total_seconds:.1f} s ({args.instances / total_seconds:.1f} instances/s): {outcomes}")
+        scp.stop()
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
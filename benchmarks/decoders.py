@@ -0,0 +1,171 @@
+"""Compare pixel data decoders on synthetic compressed DICOM fixtures.
+
+Builds a chest-sized 12-bit test image, compresses it with every transfer
+syntax that has an installed pydicom encoder (plus 8-bit JPEG Baseline via
+Pillow), then times each installed decoding plugin on each fixture and
+checks lossless round trips. Finally it decodes a batch through
+imaging.DecoderRegistry at several thread counts.
+
+Use the results to re-rank imaging.DECODER_PREFERENCES for your hardware.
+
+    python -m benchmarks.decoders [--size 2048] [--repeats 3] [--batch 16] [--save fixtures/]
+"""
+import argparse
+import copy
+import io
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from imaging import DECODE_THREADS, DecoderRegistry  # noqa: E402
+
+
+def synthetic_pixels(size, bits=12):
+    """Smooth anatomy-like structure plus detector noise, so compression ratios are realistic"""
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    top = (1 << bits) - 1
+    image = top * (0.5 + 0.3 * np.sin(6 * x) * np.cos(4 * y) - 0.2 * ((x - 0.5) ** 2 + (y - 0.5) ** 2))
+    image += np.random.default_rng(0).normal(0, top / 200, image.shape)
+    return image.clip(0, top).astype(np.uint16 if bits > 8 else np.uint8)
+
+
+def base_dataset(pixels, bits):
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = "1.2.840.10008.5.1.4.1.1.1.1"  # Digital X-Ray Image Storage
+    ds.SOPInstanceUID = generate_uid()
+    ds.Modality, ds.BodyPartExamined = "DX", "CHEST"
+    ds.Rows, ds.Columns = pixels.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 8 if bits == 8 else 16
+    ds.BitsStored, ds.HighBit, ds.PixelRepresentation = bits, bits - 1, 0
+    ds.PixelData = pixels.tobytes()
+    return ds
+
+
+def jpeg_baseline_fixture(pixels):
+    from PIL import Image
+    from pydicom.encaps import encapsulate
+    from pydicom.uid import JPEGBaseline8Bit
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+    ds = base_dataset(pixels, 8)
+    ds.file_meta.TransferSyntaxUID = JPEGBaseline8Bit
+    ds.PixelData = encapsulate([buffer.getvalue()])
+    ds["PixelData"].VR = "OB"
+    ds.LossyImageCompression = "01"
+    return ds
+
+
+def build_fixtures(size):
+    """(label, dataset, reference pixels or None when lossy) for every encodable syntax"""
+    from pydicom.uid import JPEG2000, JPEG2000Lossless, JPEGLSLossless, JPEGLSNearLossless, RLELossless
+
+    pixels = synthetic_pixels(size)
+    fixtures = []
+    for label, uid, options, lossless in [
+        ("RLE Lossless", RLELossless, {}, True),
+        ("JPEG 2000 Lossless", JPEG2000Lossless, {}, True),
+        ("JPEG 2000 (20:1)", JPEG2000, {"j2k_cr": [20]}, False),
+        ("JPEG-LS Lossless", JPEGLSLossless, {}, True),
+        ("JPEG-LS Near-Lossless", JPEGLSNearLossless, {"jls_error": 2}, False),
+    ]:
+        ds = base_dataset(pixels, 12)
+        try:
+            ds.compress(uid, pixels, **options)
+        except Exception as e:
+            print(f"  skipping {label}: {e}")
+            continue
+        fixtures.append((label, ds, pixels if lossless else None))
+
+    try:
+        fixtures.append(("JPEG Baseline (8-bit)", jpeg_baseline_fixture(synthetic_pixels(size, bits=8)), None))
+    except Exception as e:
+        print(f"  skipping JPEG Baseline: {e}")
+    return fixtures, pixels.nbytes
+
+
+def time_plugin(ds, plugin, repeats):
+    from pydicom.pixels import get_decoder
+
+    decoder = get_decoder(ds.file_meta.TransferSyntaxUID)
+    array, _ = decoder.as_array(ds, decoding_plugin=plugin)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        decoder.as_array(ds, decoding_plugin=plugin)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), array
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2048, help="Fixture rows and columns")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=16, help="Studies decoded per thread-pool run")
+    parser.add_argument("--threads", nargs="+", type=int, default=sorted({1, 2, 4, DECODE_THREADS}))
+    parser.add_argument("--save", metavar="DIR", help="Also write the fixtures as .dcm files")
+    args = parser.parse_args()
+
+    from pydicom.pixels import get_decoder
+
+    print(f"Building {args.size}x{args.size} fixtures")
+    fixtures, raw_bytes = build_fixtures(args.size)
+    registry = DecoderRegistry()
+
+    print(f"\n{'fixture':<24} {'ratio':>6} {'plugin':<10} {'ms':>8} {'MP/s':>7} {'max |err|':>10}")
+    for label, ds, reference in fixtures:
+        transfer_syntax = ds.file_meta.TransferSyntaxUID
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            name = label.lower().replace(" ", "-").replace("(", "").replace(")", "").replace(":", "to")
+            ds.save_as(os.path.join(args.save, f"{name}.dcm"), enforce_file_format=True)
+        ratio = raw_bytes / len(ds.PixelData)
+        results = []
+        for plugin in get_decoder(transfer_syntax).available_plugins:
+            try:
+                seconds, array = time_plugin(ds, plugin, args.repeats)
+            except Exception as e:
+                print(f"{label:<24} {ratio:>6.1f} {plugin:<10} failed: {e}")
+                continue
+            error = "-" if reference is None else str(int(np.abs(array.astype(np.int32) - reference).max()))
+            results.append((seconds, plugin, error))
+        for seconds, plugin, error in sorted(results):
+            megapixels = args.size * args.size / 1e6
+            print(f"{label:<24} {ratio:>6.1f} {plugin:<10} {seconds * 1000:>8.1f} {megapixels / seconds:>7.1f} "
+                  f"{error:>10}")
+        chosen = registry.plugins_for(transfer_syntax)[0]
+        fastest = min(results)[1] if results else "-"
+        missing = get_decoder(transfer_syntax).missing_dependencies
+        print(f"{'':<24} registry uses {chosen}, fastest here {fastest}"
+              + (f"; not installed: {', '.join(missing)}" if missing else ""))
+
+    print(f"\nThread pool: {args.batch} studies per fixture")
+    print(f"{'fixture':<24} " + " ".join(f"{f'{n} thr':>9}" for n in args.threads) + "  (studies/s)")
+    for label, ds, _ in fixtures:
+        batch = [copy.deepcopy(ds) for _ in range(args.batch)]
+        rates = []
+        for threads in args.threads:
+            pool = DecoderRegistry(max_workers=threads)
+            start = time.perf_counter()
+            for future in [pool.submit(study) for study in batch]:
+                future.result()
+            rates.append(len(batch) / (time.perf_counter() - start))
+            pool.executor.shutdown()
+        print(f"{label:<24} " + " ".join(f"{rate:>9.1f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
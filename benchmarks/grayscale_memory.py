@@ -0,0 +1,70 @@
+"""Per-study memory of the grey-plane decode pipeline against the old RGB one.
+
+Each variant decodes one synthetic 12-bit study (window -> uint8 -> PIL ->
+previews -> model input) in a fresh interpreter and reports the bytes kept
+per study in the decode cache and the peak RSS growth while decoding.
+
+    python -m benchmarks.grayscale_memory [--rows 3000 --columns 2500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = """
+import json, resource, sys
+import numpy as np
+from PIL import Image
+from pydicom.dataset import Dataset
+from imaging import build_previews, window_to_uint8
+from inference import IMG_SIZE, preprocess
+
+variant, rows, columns = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+ds = Dataset()
+ds.BitsStored, ds.PixelRepresentation, ds.PhotometricInterpretation = 12, 0, "MONOCHROME2"
+ds.WindowCenter, ds.WindowWidth = 2048, 3000
+pixels = np.random.default_rng(0).integers(0, 4096, size=(rows, columns), dtype=np.uint16)
+window_to_uint8(pixels[:8], ds)  # build the cached table outside the measurement
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+image = Image.fromarray(window_to_uint8(pixels, ds))
+if variant == "rgb":
+    image = image.convert("RGB")
+    model_input = np.asarray(image.resize((IMG_SIZE, IMG_SIZE)), dtype=np.float32) / 255.0
+else:
+    model_input = preprocess(image)
+previews = build_previews(image)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+retained = image.width * image.height * len(image.getbands()) + model_input.nbytes + sum(map(len, previews.values()))
+scale = 1 if sys.platform == "darwin" else 1024
+print(json.dumps({"retained": retained, "peak": peak * scale, "model_input": model_input.nbytes}))
+"""
+
+
+def measure(variant, rows, columns):
+    result = subprocess.run([sys.executable, "-c", CHILD, variant, str(rows), str(columns)], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--columns", type=int, default=2500)
+    args = parser.parse_args()
+
+    print(f"{args.rows}x{args.columns} study")
+    print(f"{'pipeline':<8} {'retained MB':>12} {'model input KB':>15} {'peak RSS MB':>12}")
+    for variant in ("rgb", "grey"):
+        stats = measure(variant, args.rows, args.columns)
+        print(f"{variant:<8} {stats['retained'] / 2 ** 20:>12.1f} {stats['model_input'] / 2 ** 10:>15.0f} "
+              f"{stats['peak'] / 2 ** 20:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
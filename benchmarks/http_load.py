@@ -0,0 +1,146 @@
+"""Load-test the HTTP inference API on localhost and report latency percentiles.
+
+Starts api.py on a free local port in this process (or targets --url) and
+POSTs synthetic DICOM chest studies from a pool of client threads at each
+concurrency level. Every request carries distinct pixels so nothing is
+answered from the prediction cache; pass --cached to measure cache hits.
+
+By default the model is a stand-in that returns constant probabilities, so
+the HTTP, decode and batching path is measured; pass --model to include a
+real one.
+
+    python -m benchmarks.http_load [--concurrency 1 4 16 64] [--requests 200] [--size 1024] [--model model.h5]
+"""
+import argparse
+import http.client
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference import InferenceEngine, load_model  # noqa: E402
+
+
+def study_template(size):
+    """Encoded DICOM chest study; requests rewrite its last pixels to make each one unique"""
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    meta = FileMetaDataset()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.1.1"  # Digital X-Ray Image Storage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds = FileDataset(None, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID, ds.SOPInstanceUID = meta.MediaStorageSOPClassUID, meta.MediaStorageSOPInstanceUID
+    ds.Modality, ds.BodyPartExamined = "DX", "CHEST"
+    ds.Rows = ds.Columns = size
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 12, 11, 0
+    ds.WindowCenter, ds.WindowWidth = 2048, 4096
+    ds.PixelData = np.random.default_rng(0).integers(0, 4096, size=(size, size), dtype=np.uint16).tobytes()
+    buffer = io.BytesIO()
+    ds.save_as(buffer, enforce_file_format=True)
+    return buffer.getvalue()
+
+
+class Client:
+    """Keep-alive connection per client thread"""
+
+    def __init__(self, url):
+        self.url = urlsplit(url)
+        self.local = threading.local()
+
+    def post(self, body):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.url.hostname, self.url.port,
+                                                                            timeout=300)
+        start = time.perf_counter()
+        connection.request("POST", self.url.path, body=body, headers={"Content-Type": "application/dicom"})
+        response = connection.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+
+
+def run_level(client, template, concurrency, requests, counter, cached):
+    def one(_):
+        body = bytearray(template)
+        if not cached:
+            # Distinct 12-bit values in the last two pixels so every request misses the cache
+            n = next(counter)
+            body[-4:] = np.array([n & 0xFFF, (n >> 12) & 0xFFF], dtype="<u2").tobytes()
+        return client.post(bytes(body))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(seconds * 1000 for seconds, status in results if status == 200)
+    errors = sum(1 for _, status in results if status != 200)
+    return latencies, errors, elapsed
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--size", type=int, default=1024, help="Study rows and columns")
+    parser.add_argument("--model", help="Run a real model instead of the constant stand-in")
+    parser.add_argument("--url", help="Target a running API instead, e.g. http://127.0.0.1:8502/v1/analyze")
+    parser.add_argument("--cached", action="store_true", help="Repeat one study so requests hit the cache")
+    args = parser.parse_args()
+
+    engine = None
+    url = args.url
+    if url is None:
+        from api import serve_in_background
+        from prediction_cache import PredictionCache
+
+        if args.model:
+            model = load_model(args.model, [1, 2, 4, 8])
+        else:
+            def model(batch):
+                return np.full((len(batch), 3), 1 / 3, dtype=np.float32)
+        engine = InferenceEngine(model)
+        cache = PredictionCache(cache_dir=tempfile.mkdtemp(prefix="http-load-cache-"))
+        server = serve_in_background(engine, cache, host="127.0.0.1", port=0)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/v1/analyze"
+
+    template = study_template(args.size)
+    client = Client(url)
+    counter = iter(range(1, 1 << 62))
+    run_level(client, template, 1, 2, counter, args.cached)  # warm up decoders and the model
+
+    print(f"{args.size}x{args.size} studies ({len(template) / 2 ** 20:.1f} MB), {args.requests} requests per level"
+          f"{', cached' if args.cached else ''}")
+    print(f"{'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mean ms':>8} {'errors':>7}")
+    for concurrency in args.concurrency:
+        latencies, errors, elapsed = run_level(client, template, concurrency, args.requests, counter, args.cached)
+        mean = statistics.fmean(latencies) if latencies else float("nan")
+        print(f"{concurrency:>5} {args.requests / elapsed:>8.1f} {percentile(latencies, 50):>8.1f} "
+              f"{percentile(latencies, 90):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{(latencies or [float('nan')])[-1]:>8.1f} {mean:>8.1f} {errors:>7}")
+    if engine is not None:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare cold-start model load time of the HDF5 Keras model and of every converted backend.
+
+Each load runs in a fresh interpreter so the numbers reflect a process cold
+start; TensorFlow import time is excluded. The time includes warming the
+model up for a batch of one, i.e. until it can answer its first request.
+Backends that have not been converted (see convert_model.py) are skipped.
+
+    python -m benchmarks.model_load_time [model.h5] [--repeats 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference import BACKENDS, MODEL_PATH, quantized_path_for  # noqa: E402
+
+CHILD = """
+import json, sys, time
+import tensorflow as tf
+import inference
+start = time.perf_counter()
+inference.load_model(sys.argv[1], [1], backend=sys.argv[2])
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def time_load(model_path, backend):
+    result = subprocess.run([sys.executable, "-c", CHILD, model_path, backend], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])["seconds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model_path", nargs="?", default=MODEL_PATH)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for backend in BACKENDS:
+        if backend != 'keras' and not os.path.exists(quantized_path_for(args.model_path, backend)):
+            print(f"{backend:>12}: not converted, skipping")
+            continue
+        try:
+            times = [time_load(args.model_path, backend) for _ in range(args.repeats)]
+        except subprocess.CalledProcessError as e:
+            print(f"{backend:>12}: unavailable ({e.stderr.strip().splitlines()[-1]})")
+            continue
+        print(f"{backend:>12}: median {statistics.median(times) * 1000:8.1f} ms  "
+              f"(min {min(times) * 1000:.1f} ms, max {max(times) * 1000:.1f} ms, n={len(times)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare the original float64 DICOM normalization with imaging.normalize_to_uint8.
+
+Runs both on synthetic 12-bit images and reports median wall time and peak
+traced allocation (tracemalloc sees numpy buffers) for each size. With
+``--window`` the comparison is apply_voi_lut + normalization against the
+cached lookup table of imaging.window_to_uint8 instead.
+
+    python -m benchmarks.normalization [--sizes 2048 3000 4096] [--repeats 5] [--window 2048 1500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from imaging import normalize_to_uint8, window_to_uint8  # noqa: E402
+
+
+def legacy_normalize(image, invert=False):
+    """The normalization load_dicom_image used before normalize_to_uint8"""
+    if invert:
+        image = np.amax(image) - image
+    image = image - np.min(image)
+    if np.max(image) > 0:
+        return (image / np.max(image) * 255).astype(np.uint8)
+    return np.zeros_like(image, dtype=np.uint8)
+
+
+def windowing_dataset(center, width, invert):
+    from pydicom.dataset import Dataset
+
+    ds = Dataset()
+    ds.BitsStored = 12
+    ds.PixelRepresentation = 0
+    ds.PhotometricInterpretation = "MONOCHROME1" if invert else "MONOCHROME2"
+    ds.WindowCenter = center
+    ds.WindowWidth = width
+    return ds
+
+
+def measure(fn, image, invert, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(image, invert=invert)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(image, invert=invert)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[2048, 3000, 4096])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--invert", action="store_true", help="Benchmark the MONOCHROME1 path")
+    parser.add_argument("--window", nargs=2, type=float, metavar=("CENTER", "WIDTH"),
+                        help="Benchmark VOI windowing + normalization with this window")
+    args = parser.parse_args()
+
+    legacy, fused = legacy_normalize, normalize_to_uint8
+    if args.window:
+        from pydicom.pixel_data_handlers.util import apply_voi_lut
+
+        ds = windowing_dataset(*args.window, args.invert)
+
+        def legacy(image, invert=False):
+            return legacy_normalize(apply_voi_lut(image, ds), invert=invert)
+
+        def fused(image, invert=False):
+            return window_to_uint8(image, ds, invert=invert)
+
+    rng = np.random.default_rng(0)
+    print(f"{'size':>10} {'impl':<8} {'ms':>9} {'peak MB':>9} {'max |diff|':>11}")
+    for size in args.sizes:
+        image = rng.integers(0, 4096, size=(size, size), dtype=np.uint16)
+        legacy_ms, legacy_peak, expected = measure(legacy, image, args.invert, args.repeats)
+        fused_ms, fused_peak, actual = measure(fused, image, args.invert, args.repeats)
+        diff = int(np.abs(expected.astype(np.int16) - actual).max())
+        label = f"{size}x{size}"
+        print(f"{label:>10} {'legacy':<8} {legacy_ms * 1000:>9.1f} {legacy_peak / 2 ** 20:>9.1f}")
+        print(f"{label:>10} {'fused':<8} {fused_ms * 1000:>9.1f} {fused_peak / 2 ** 20:>9.1f} {diff:>11}")
+
+
+if __name__ == "__main__":
+    main()
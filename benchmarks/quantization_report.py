@@ -0,0 +1,76 @@
+"""Compare quantized backends against the full-precision Keras model.
+
+For every backend that has been converted (see convert_model.py) this reports
+argmax agreement with Keras, mean absolute probability difference and
+per-image latency on a directory of evaluation images.
+
+    python convert_model.py --format tflite-fp16
+    python convert_model.py --format tflite-int8 --calibration-dir calib/
+    python -m benchmarks.quantization_report --eval-dir eval/
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from convert_model import load_calibration_images  # noqa: E402
+from inference import BACKENDS, MODEL_PATH, load_model, quantized_path_for, to_probabilities  # noqa: E402
+
+
+def run_backend(model, images, batch_size):
+    """Return probabilities for all images and the per-image latency of each batch"""
+    outputs, latencies = [], []
+    for start in range(0, len(images), batch_size):
+        batch = np.stack(images[start:start + batch_size])
+        t0 = time.perf_counter()
+        outputs.append(to_probabilities(model(batch)))
+        latencies.append((time.perf_counter() - t0) / len(batch))
+    return np.concatenate(outputs), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model_path", nargs="?", default=MODEL_PATH)
+    parser.add_argument("--eval-dir", required=True, help="Directory of DICOM/PNG/JPEG evaluation images")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=[b for b in BACKENDS if b != 'keras'], choices=BACKENDS)
+    args = parser.parse_args()
+
+    images = load_calibration_images(args.eval_dir, args.limit)
+    if not images:
+        parser.error(f"No images found in {args.eval_dir}")
+
+    reference, reference_latency = run_backend(
+        load_model(args.model_path, [args.batch_size], backend='keras'), images, args.batch_size)
+    reference_labels = reference.argmax(axis=1)
+
+    print(f"{len(images)} images, batch size {args.batch_size}")
+    print(f"{'backend':<12} {'agreement':>10} {'mean |dp|':>10} {'ms/image':>10} {'speedup':>8}")
+    keras_ms = statistics.median(reference_latency) * 1000
+    print(f"{'keras':<12} {100.0:>9.2f}% {0.0:>10.4f} {keras_ms:>10.2f} {1.0:>7.2f}x")
+
+    for backend in args.backends:
+        if not os.path.exists(quantized_path_for(args.model_path, backend)):
+            print(f"{backend:<12} not converted, skipping")
+            continue
+        try:
+            model = load_model(args.model_path, [args.batch_size], backend=backend)
+        except ImportError as e:
+            print(f"{backend:<12} unavailable ({e})")
+            continue
+        probabilities, latency = run_backend(model, images, args.batch_size)
+        agreement = float(np.mean(probabilities.argmax(axis=1) == reference_labels)) * 100
+        difference = float(np.mean(np.abs(probabilities - reference)))
+        ms = statistics.median(latency) * 1000
+        print(f"{backend:<12} {agreement:>9.2f}% {difference:>10.4f} {ms:>10.2f} {keras_ms / ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
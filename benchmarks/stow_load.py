@@ -0,0 +1,158 @@
+"""Push hundreds of instances to the STOW-RS endpoint and measure ingest and analysis.
+
+Starts api.py on a free local port in this process (or targets --url) and
+streams synthetic DICOM chest instances as multipart/related requests with
+chunked transfer encoding, from several clients at once. Reports upload
+throughput, the server's peak traced memory while receiving (which should
+stay far below the request size), and how long the background queue takes
+to analyze everything.
+
+By default the model is a stand-in that returns constant probabilities; pass
+--model to include a real one.
+
+    python -m benchmarks.stow_load [--instances 400] [--clients 4] [--size 1024] [--model model.h5]
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.http_load import study_template  # noqa: E402
+from inference import InferenceEngine, load_model  # noqa: E402
+
+STUDY_UID = "1.2.826.0.1.3680043.8.498.1"
+
+
+def instance(template, number):
+    """The template with its own SOP Instance UID and distinct last pixels"""
+    import pydicom
+
+    ds = pydicom.dcmread(io.BytesIO(template))
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = f"{STUDY_UID}.{number}"
+    ds.StudyInstanceUID = STUDY_UID
+    pixels = bytearray(ds.PixelData)
+    pixels[-4:] = np.array([number & 0xFFF, (number >> 12) & 0xFFF], dtype="<u2").tobytes()
+    ds.PixelData = bytes(pixels)
+    buffer = io.BytesIO()
+    ds.save_as(buffer, enforce_file_format=True)
+    return buffer.getvalue()
+
+
+def multipart_body(template, numbers, boundary):
+    """Yield the request body part by part so the client never holds it whole either"""
+    for number in numbers:
+        yield f"--{boundary}\r\nContent-Type: application/dicom\r\n\r\n".encode()
+        yield instance(template, number)
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+
+def push(url, template, numbers):
+    boundary = uuid.uuid4().hex
+    target = urlsplit(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=600)
+    connection.request("POST", f"{target.path}/studies/{STUDY_UID}",
+                       body=multipart_body(template, numbers, boundary), encode_chunked=True,
+                       headers={"Content-Type": f'multipart/related; type="application/dicom"; boundary={boundary}',
+                                "Accept": "application/dicom+json"})
+    response = connection.getresponse()
+    result = json.loads(response.read())
+    return response.status, len(result.get('00081199', {}).get('Value', [])), \
+        len(result.get('00081198', {}).get('Value', []))
+
+
+def wait_for_results(base_url, sop_uids, timeout=600):
+    target = urlsplit(base_url)
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+    pending = list(sop_uids)
+    deadline = time.perf_counter() + timeout
+    statuses = {}
+    while pending and time.perf_counter() < deadline:
+        still = []
+        for sop_uid in pending:
+            connection.request("GET", f"/v1/instances/{sop_uid}")
+            response = connection.getresponse()
+            result = json.loads(response.read())
+            if response.status == 202:
+                still.append(sop_uid)
+            else:
+                status = result.get('status', response.status)
+                statuses[status] = statuses.get(status, 0) + 1
+        pending = still
+        if pending:
+            time.sleep(0.05)
+    return statuses, len(pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=400)
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent STOW-RS requests")
+    parser.add_argument("--size", type=int, default=1024, help="Instance rows and columns")
+    parser.add_argument("--model", help="Run a real model instead of the constant stand-in")
+    parser.add_argument("--url", help="Target a running API instead, e.g. http://127.0.0.1:8502/dicomweb")
+    args = parser.parse_args()
+
+    engine = None
+    url = args.url
+    if url is None:
+        from api import serve_in_background
+        from prediction_cache import PredictionCache
+
+        if args.model:
+            model = load_model(args.model, [1, 2, 4, 8])
+        else:
+            def model(batch):
+                return np.full((len(batch), 3), 1 / 3, dtype=np.float32)
+        engine = InferenceEngine(model)
+        cache = PredictionCache(cache_dir=tempfile.mkdtemp(prefix="stow-load-cache-"))
+        server = serve_in_background(engine, cache, host="127.0.0.1", port=0)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/dicomweb"
+
+    template = study_template(args.size)
+    numbers = list(range(1, args.instances + 1))
+    batches = [numbers[i::args.clients] for i in range(args.clients)]
+    request_mb = len(template) * args.instances / 2 ** 20
+
+    if engine is not None:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(lambda batch: push(url, template, batch), batches))
+    upload_seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if engine is not None else None
+    tracemalloc.stop()
+
+    statuses, unfinished = wait_for_results(url, [f"{STUDY_UID}.{n}" for n in numbers])
+    total_seconds = time.perf_counter() - start
+
+    stored = sum(r[1] for r in results)
+    failed = sum(r[2] for r in results)
+    print(f"{args.instances} instances of {len(template) / 2 ** 20:.1f} MB ({request_mb:.0f} MB) "
+          f"in {args.clients} requests; HTTP status {sorted({r[0] for r in results})}")
+    print(f"stored {stored}, failed {failed}; upload {upload_seconds:.1f} s "
+          f"({request_mb / upload_seconds:.0f} MB/s, {args.instances / upload_seconds:.1f} instances/s)")
+    if peak is not None:
+        print(f"peak traced memory while receiving: {peak / 2 ** 20:.1f} MB (client and server)")
+    print(f"all analyzed after {total_seconds:.1f} s ({args.instances / total_seconds:.1f} instances/s): "
+          f"{statuses}" + (f", {unfinished} unfinished" if unfinished else ""))
+    if engine is not None:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Peak memory of multi-frame analysis: materializing every frame vs streaming them.
+
+For each frame count a synthetic multi-frame study is built first (its
+encoded pixel data is not counted), then analyzed both ways while
+tracemalloc records the peak of everything allocated on top:
+
+    materialize  decode the whole pixel array, preprocess every frame, predict
+    stream       imaging iter_frames -> preprocess -> inference.predict_stream
+
+By default the model is a stand-in that returns constant probabilities so
+only the pipeline is measured; pass --model to include a real one.
+
+    python -m benchmarks.streaming_memory [--frames 16 64 256] [--size 512] [--model model.h5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from imaging import DecoderRegistry, window_to_uint8  # noqa: E402
+from inference import InferenceEngine, load_model, predict_stream, preprocess  # noqa: E402
+
+
+def multiframe_dataset(frames, size, transfer_syntax):
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian
+
+    pixels = np.random.default_rng(0).integers(0, 4096, size=(frames, size, size), dtype=np.uint16)
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.Rows = ds.Columns = size
+    ds.NumberOfFrames = frames
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 12, 11, 0
+    ds.WindowCenter, ds.WindowWidth = 2048, 4096
+    ds.PixelData = pixels.tobytes()
+    if transfer_syntax != ExplicitVRLittleEndian:
+        ds.compress(transfer_syntax, pixels)
+    return ds
+
+
+def to_input(frame, ds):
+    from PIL import Image
+
+    return preprocess(Image.fromarray(window_to_uint8(frame, ds)))
+
+
+def materialize(ds, engine, registry):
+    frames = registry.decode_frames(ds)
+    inputs = [to_input(frame, ds) for frame in frames]
+    return np.mean([future.result() for future in [engine.submit(x) for x in inputs]], axis=0)
+
+
+def stream(ds, engine, registry):
+    return predict_stream(engine, (to_input(frame, ds) for _, frame in registry.iter_frames(ds)))
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, seconds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", nargs="+", type=int, default=[16, 64, 256])
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--rle", action="store_true", help="RLE-compress the fixtures")
+    parser.add_argument("--model", help="Run a real model instead of the constant stand-in")
+    args = parser.parse_args()
+
+    from pydicom.uid import ExplicitVRLittleEndian, RLELossless
+
+    if args.model:
+        model = load_model(args.model, [1, 2, 4, 8])
+    else:
+        def model(batch):
+            return np.full((len(batch), 3), 1 / 3, dtype=np.float32)
+    engine = InferenceEngine(model)
+    registry = DecoderRegistry()
+
+    print(f"{args.size}x{args.size} frames, {'RLE' if args.rle else 'uncompressed'}")
+    print(f"{'frames':>7} {'encoded MB':>11} {'materialize MB':>15} {'stream MB':>10} {'stream s':>9}")
+    for frames in args.frames:
+        ds = multiframe_dataset(frames, args.size, RLELossless if args.rle else ExplicitVRLittleEndian)
+        full_peak, _, expected = measure(materialize, ds, engine, registry)
+        stream_peak, seconds, actual = measure(stream, ds, engine, registry)
+        assert np.allclose(expected, actual, atol=1e-5)
+        print(f"{frames:>7} {len(ds.PixelData) / 2 ** 20:>11.1f} {full_peak / 2 ** 20:>15.1f} "
+              f"{stream_peak / 2 ** 20:>10.1f} {seconds:>9.2f}")
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+
+from PIL import Image
+
+from imaging import window_to_uint8
+from inference import MODEL_PATH, quantized_path_for, export_tflite, export_onnx, preprocess
+
+IMAGE_EXTENSIONS = ('.dcm', '.png', '.jpg', '.jpeg')
+
+
+def load_calibration_image(path):
+    """Read a DICOM or standard image into a PIL image for calibration"""
+    if not path.lower().endswith('.dcm'):
+        return Image.open(path)
+
+    import pydicom
+
+    dicom_data = pydicom.dcmread(path)
+    invert = getattr(dicom_data, 'PhotometricInterpretation', None) == "MONOCHROME1"
+    return Image.fromarray(window_to_uint8(dicom_data.pixel_array, dicom_data, invert=invert))
+
+
+def load_calibration_images(directory, limit=200):
+    """Preprocessed model inputs for up to ``limit`` images found under ``directory``"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(IMAGE_EXTENSIONS))
+    return [preprocess(load_calibration_image(path)) for path in sorted(paths)[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the HDF5 model into a quantized or ONNX backend")
+    parser.add_argument("model_path", nargs="?", default=MODEL_PATH, help="HDF5 model to convert")
+    parser.add_argument("--format", required=True, choices=["tflite-fp16", "tflite-int8", "onnx"],
+                        help="tflite-*: post-training quantized; onnx: ONNX Runtime")
+    parser.add_argument("--output", help="Output path (default: next to the model)")
+    parser.add_argument("--calibration-dir", help="Directory of representative images for int8 calibration")
+    parser.add_argument("--calibration-limit", type=int, default=200, help="Maximum number of calibration images")
+    args = parser.parse_args()
+
+    if args.format == "onnx":
+        output = export_onnx(args.model_path, args.output or quantized_path_for(args.model_path, "onnx"))
+    else:
+        calibration_images = None
+        if args.format == "tflite-int8":
+            if not args.calibration_dir:
+                parser.error("--calibration-dir is required for tflite-int8")
+            calibration_images = load_calibration_images(args.calibration_dir, args.calibration_limit)
+            if not calibration_images:
+                parser.error(f"No images found in {args.calibration_dir}")
+            print(f"Calibrating on {len(calibration_images)} images")
+        output = export_tflite(args.model_path, args.format, calibration_images, args.output)
+    print(f"Wrote {args.format} model to {output}")
+
+
+if __name__ == "__main__":
+    main()
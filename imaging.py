@@ -0,0 +1,416 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, features
+
+# Rows normalized/gathered per step; bounds scratch buffers independent of image size
+NORMALIZE_CHUNK_ROWS = 256
+# Windowing lookup tables kept in memory (a 16-bit table is 256 KB float32 + 64 KB uint8)
+VOI_TABLE_ENTRIES = int(os.environ.get("PULMOVISTA_VOI_TABLE_ENTRIES", "32"))
+# Display previews encoded once per upload. st.image serves JPEG/PNG bytes up to 1460 px wide as-is
+# and re-encodes anything else, so those are the defaults.
+PREVIEW_WIDTHS = tuple(int(w) for w in os.environ.get("PULMOVISTA_PREVIEW_WIDTHS", "360,720,1440").split(","))
+PREVIEW_FORMAT = os.environ.get("PULMOVISTA_PREVIEW_FORMAT", "JPEG").upper()
+PREVIEW_QUALITY = int(os.environ.get("PULMOVISTA_PREVIEW_QUALITY", "85"))
+# Where uploads are spooled before parsing (system temp dir by default)
+SPOOL_DIR = os.environ.get("PULMOVISTA_SPOOL_DIR") or None
+SPOOL_CHUNK_BYTES = 1 << 20
+# Threads shared by DecoderRegistry.submit() and multi-frame decoding
+DECODE_THREADS = int(os.environ.get("PULMOVISTA_DECODE_THREADS", str(os.cpu_count() or 1)))
+
+# pydicom decoding plugins per transfer syntax, fastest first as ranked by benchmarks.decoders.
+# The first installed plugin is used and the others are fallbacks; unlisted syntaxes use pydicom's choice.
+DECODER_PREFERENCES = {
+    "1.2.840.10008.1.2.5": ("pylibjpeg", "pydicom"),  # RLE Lossless
+    "1.2.840.10008.1.2.4.50": ("pillow", "pylibjpeg", "gdcm"),  # JPEG Baseline
+    "1.2.840.10008.1.2.4.51": ("pylibjpeg", "gdcm", "pillow"),  # JPEG Extended
+    "1.2.840.10008.1.2.4.57": ("pylibjpeg", "gdcm"),  # JPEG Lossless
+    "1.2.840.10008.1.2.4.70": ("pylibjpeg", "gdcm"),  # JPEG Lossless SV1
+    "1.2.840.10008.1.2.4.80": ("pyjpegls", "gdcm", "pylibjpeg"),  # JPEG-LS Lossless
+    "1.2.840.10008.1.2.4.81": ("pyjpegls", "gdcm", "pylibjpeg"),  # JPEG-LS Near-Lossless
+    "1.2.840.10008.1.2.4.90": ("pylibjpeg", "gdcm", "pillow"),  # JPEG 2000 Lossless
+    "1.2.840.10008.1.2.4.91": ("pylibjpeg", "gdcm", "pillow"),  # JPEG 2000
+    "1.2.840.10008.1.2.4.201": ("pylibjpeg",),  # HTJ2K Lossless
+    "1.2.840.10008.1.2.4.202": ("pylibjpeg",),  # HTJ2K Lossless RPCL
+    "1.2.840.10008.1.2.4.203": ("pylibjpeg",),  # HTJ2K
+}
+
+_voi_tables = OrderedDict()
+_voi_tables_lock = threading.Lock()
+
+
+def normalize_to_uint8(image, invert=False, out=None, chunk_rows=NORMALIZE_CHUNK_ROWS):
+    """Min/max scale a 2-D pixel array to uint8 in one pass, optionally inverting it (MONOCHROME1).
+
+    Equivalent to ``(image - min) / (max - min) * 255`` (or ``(max - image)``
+    when inverting), but computed in float32 over blocks of ``chunk_rows``
+    rows into a single preallocated uint8 output, so no full-resolution
+    float64 temporaries are created.
+    """
+    image = np.asarray(image)
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+
+    lo = image.min()
+    hi = image.max()
+    if hi <= lo:
+        out.fill(0)
+        return out
+
+    scale = np.float32(255.0 / (float(hi) - float(lo)))
+    scratch = np.empty((min(chunk_rows, image.shape[0]),) + image.shape[1:], dtype=np.float32)
+    for start in range(0, image.shape[0], chunk_rows):
+        block = image[start:start + chunk_rows]
+        tmp = scratch[:len(block)]
+        if invert:
+            np.subtract(np.float32(hi), block, out=tmp, dtype=np.float32)
+        else:
+            np.subtract(block, np.float32(lo), out=tmp, dtype=np.float32)
+        np.multiply(tmp, scale, out=tmp)
+        np.rint(tmp, out=tmp)
+        np.copyto(out[start:start + chunk_rows], tmp, casting='unsafe')
+    return out
+
+
+def _first_value(ds, keyword):
+    """Value 0 of a possibly multi-valued element, as apply_voi_lut reads it"""
+    value = ds.get(keyword)
+    if value is None:
+        return None
+    if not isinstance(value, (int, float, str)):
+        value = value[0]
+    return float(value)
+
+
+def voi_table_key(ds, dtype):
+    """Cache key for the windowing table of ``ds``, or None if its VOI can't be expressed as a table here.
+
+    Only integer pixel data up to 16 bits with plain Window Center/Width
+    windowing qualifies; VOI LUT and Modality LUT sequences fall back to
+    apply_voi_lut.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind not in 'iu' or dtype.itemsize > 2:
+        return None
+    if ds.get('VOILUTSequence') or ds.get('ModalityLUTSequence'):
+        return None
+    center, width = _first_value(ds, 'WindowCenter'), _first_value(ds, 'WindowWidth')
+    if center is None or width is None:
+        return None
+    return (
+        dtype.str,
+        int(ds.BitsStored),
+        int(ds.PixelRepresentation),
+        center,
+        width,
+        str(ds.get('VOILUTFunction', 'LINEAR')).upper(),
+        _first_value(ds, 'RescaleSlope'),
+        _first_value(ds, 'RescaleIntercept'),
+    )
+
+
+def _cached_table(key, build):
+    with _voi_tables_lock:
+        table = _voi_tables.get(key)
+        if table is not None:
+            _voi_tables.move_to_end(key)
+            return table
+    table = build()
+    with _voi_tables_lock:
+        _voi_tables[key] = table
+        while len(_voi_tables) > VOI_TABLE_ENTRIES:
+            _voi_tables.popitem(last=False)
+    return table
+
+
+def voi_table(ds, dtype, key=None):
+    """Windowed output for every value of ``dtype``, indexed by the value's unsigned bit pattern (float32)"""
+    key = key or voi_table_key(ds, dtype)
+    if key is None:
+        return None
+
+    def build():
+        from pydicom.pixel_data_handlers.util import apply_voi_lut
+
+        dtype_ = np.dtype(dtype)
+        values = np.arange(1 << (8 * dtype_.itemsize), dtype=f"u{dtype_.itemsize}").view(dtype_)
+        table = np.asarray(apply_voi_lut(values, ds), dtype=np.float32)
+        table.setflags(write=False)
+        return table
+
+    return _cached_table(key, build)
+
+
+def window_to_uint8(pixels, ds, invert=False):
+    """Window ``pixels`` with the dataset's VOI and min/max scale to uint8 in a single table gather.
+
+    Produces the same image as ``apply_voi_lut`` followed by
+    normalize_to_uint8, falling back to exactly that when the dataset's
+    VOI isn't table-mappable (see voi_table_key).
+    """
+    pixels = np.asarray(pixels)
+    key = voi_table_key(ds, pixels.dtype)
+    if key is None:
+        if ds.get('WindowCenter') is not None and ds.get('WindowWidth') is not None:
+            from pydicom.pixel_data_handlers.util import apply_voi_lut
+            pixels = apply_voi_lut(pixels, ds)
+        return normalize_to_uint8(pixels, invert=invert)
+
+    # Windowing is monotonic, so the windowed image spans the table between the raw extremes
+    table = voi_table(ds, pixels.dtype, key)
+    index_dtype = np.dtype(f"u{pixels.dtype.itemsize}")
+    lo, hi = int(pixels.min()), int(pixels.max())
+    present = table[np.arange(lo, hi + 1).astype(pixels.dtype).view(index_dtype)]
+    w_lo, w_hi = float(present.min()), float(present.max())
+
+    def build():
+        if w_hi <= w_lo:
+            return np.zeros(len(table), dtype=np.uint8)
+        lut = (np.float32(w_hi) - table) if invert else (table - np.float32(w_lo))
+        lut *= np.float32(255.0 / (w_hi - w_lo))
+        np.clip(lut, 0, 255, out=lut)
+        np.rint(lut, out=lut)
+        lut = lut.astype(np.uint8)
+        lut.setflags(write=False)
+        return lut
+
+    lut = _cached_table((key, w_lo, w_hi, invert), build)
+    # Gather in row blocks so the intp index scratch take() uses stays small
+    index = pixels.view(index_dtype)
+    out = np.empty(pixels.shape, dtype=np.uint8)
+    for start in range(0, pixels.shape[0], NORMALIZE_CHUNK_ROWS):
+        np.take(lut, index[start:start + NORMALIZE_CHUNK_ROWS], out=out[start:start + NORMALIZE_CHUNK_ROWS])
+    return out
+
+
+def build_previews(image, widths=PREVIEW_WIDTHS, fmt=PREVIEW_FORMAT, quality=PREVIEW_QUALITY):
+    """Encode downsampled copies of ``image`` for display, keyed by pixel width.
+
+    Each level is resampled from the next larger one, and levels wider
+    than the image collapse to a single full-width preview.
+    """
+    if fmt == 'WEBP' and not features.check('webp'):
+        fmt = 'JPEG'
+    previews = {}
+    level = image
+    for width in sorted({min(w, image.width) for w in widths}, reverse=True):
+        if level.width != width:
+            height = max(1, round(image.height * width / image.width))
+            level = level.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        level.save(buffer, format=fmt, quality=quality)
+        previews[width] = buffer.getvalue()
+    return previews
+
+
+def pick_preview(previews, target_width):
+    """Encoded bytes of the smallest preview at least ``target_width`` wide, or of the largest one"""
+    fitting = [width for width in previews if width >= target_width]
+    return previews[min(fitting) if fitting else max(previews)]
+
+
+def remove_quietly(path):
+    """Delete a file, ignoring one that is already gone"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def read_spooled_dicom(source, defer_size=None, directory=SPOOL_DIR):
+    """Copy a file-like upload to a temp file in chunks and parse it from there.
+
+    Parsing from a path lets large elements stay deferred on disk and lets
+    DecoderRegistry memory-map uncompressed pixel data. The file is removed
+    once the returned dataset is garbage collected. A path is parsed in
+    place and left for the caller to remove.
+    """
+    import pydicom
+
+    if isinstance(source, (str, os.PathLike)):
+        return pydicom.dcmread(source, defer_size=defer_size)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".dcm", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as spool:
+            shutil.copyfileobj(source, spool, SPOOL_CHUNK_BYTES)
+        ds = pydicom.dcmread(path, defer_size=defer_size)
+    except Exception:
+        remove_quietly(path)
+        raise
+    weakref.finalize(ds, remove_quietly, path)
+    return ds
+
+
+def _stored_bits_clean(pixels, ds):
+    """True if no value uses bits above BitsStored, i.e. the raw array equals what pydicom would decode"""
+    bits_stored, bits_allocated = int(ds.BitsStored), int(ds.BitsAllocated)
+    if bits_stored >= bits_allocated:
+        return True
+    if ds.PixelRepresentation:
+        low, high = -(1 << (bits_stored - 1)), (1 << (bits_stored - 1)) - 1
+    else:
+        low, high = 0, (1 << bits_stored) - 1
+    return low <= int(pixels.min()) and int(pixels.max()) <= high
+
+
+def num_frames(ds):
+    """Number of frames in a DICOM dataset (1 for single-frame studies)"""
+    return int(ds.get('NumberOfFrames', 1) or 1)
+
+
+class DecoderRegistry:
+    """Picks the pixel data decoding plugin for each transfer syntax and decodes with fallback.
+
+    ``preferences`` maps transfer syntax UIDs to pydicom plugin names,
+    fastest first; register() promotes or adds one (including plugins added
+    to pydicom with ``get_decoder(uid).add_plugin``). Decoding runs in the
+    calling thread, or on a shared pool of ``max_workers`` threads through
+    submit() and, for multi-frame studies, decode_frames().
+    """
+
+    def __init__(self, preferences=DECODER_PREFERENCES, max_workers=DECODE_THREADS):
+        self.preferences = {uid: list(plugins) for uid, plugins in preferences.items()}
+        self.max_workers = max(1, int(max_workers))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, transfer_syntax, plugin, first=True):
+        """Rank ``plugin`` first (or last) for ``transfer_syntax``"""
+        plugins = self.preferences.setdefault(str(transfer_syntax), [])
+        if plugin in plugins:
+            plugins.remove(plugin)
+        plugins.insert(0 if first else len(plugins), plugin)
+
+    def plugins_for(self, transfer_syntax):
+        """Installed plugins for ``transfer_syntax`` in the order they are tried ('' lets pydicom choose)"""
+        from pydicom.pixels import get_decoder
+
+        available = get_decoder(transfer_syntax).available_plugins
+        ranked = [plugin for plugin in self.preferences.get(str(transfer_syntax), ()) if plugin in available]
+        ranked += [plugin for plugin in available if plugin not in ranked]
+        return ranked or ['']
+
+    def native_pixels(self, ds):
+        """Read-only np.memmap over uncompressed pixel data that is still deferred on disk, else None.
+
+        Applies to little-endian, single-sample, 8/16/32-bit data of a
+        dataset parsed from a file path with PixelData deferred (see
+        read_spooled_dicom); the array has shape ``(frames, rows, columns)``
+        for multi-frame studies and ``(rows, columns)`` otherwise.
+        """
+        transfer_syntax = ds.file_meta.TransferSyntaxUID
+        filename = getattr(ds, 'filename', None)
+        if (transfer_syntax.is_compressed or transfer_syntax.is_deflated or not transfer_syntax.is_little_endian
+                or not isinstance(filename, str)):
+            return None
+        if int(ds.get('SamplesPerPixel', 1)) != 1 or int(ds.get('BitsAllocated', 0)) not in (8, 16, 32):
+            return None
+        raw = ds.get_item('PixelData', keep_deferred=True)
+        if raw is None or getattr(raw, 'value', b'') is not None or getattr(raw, 'value_tell', None) is None:
+            return None
+
+        count = num_frames(ds)
+        shape = (count, int(ds.Rows), int(ds.Columns)) if count > 1 else (int(ds.Rows), int(ds.Columns))
+        dtype = np.dtype(f"<{'i' if ds.PixelRepresentation else 'u'}{int(ds.BitsAllocated) // 8}")
+        if raw.length < int(np.prod(shape)) * dtype.itemsize:
+            return None
+        return np.memmap(filename, dtype=dtype, mode='r', offset=raw.value_tell, shape=shape)
+
+    def decode(self, ds, index=None):
+        """Pixel array of ``ds`` (or of frame ``index``) from the fastest plugin that succeeds.
+
+        Uncompressed data on disk is returned as a read-only memmap view
+        instead of being copied, provided its unused high bits are clear.
+        """
+        from pydicom.pixels import get_decoder
+
+        pixels = self.native_pixels(ds)
+        if pixels is not None:
+            if index is not None and num_frames(ds) > 1:
+                pixels = pixels[index]
+            if _stored_bits_clean(pixels, ds):
+                return pixels
+
+        transfer_syntax = ds.file_meta.TransferSyntaxUID
+        decoder = get_decoder(transfer_syntax)
+        errors = []
+        for plugin in self.plugins_for(transfer_syntax):
+            try:
+                array, _ = decoder.as_array(ds, index=index, decoding_plugin=plugin)
+                return array
+            except Exception as e:
+                errors.append(f"{plugin or 'pydicom'}: {e}")
+        raise ValueError(f"Unable to decode {transfer_syntax.name} pixel data ({'; '.join(errors)})")
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="dicom-decode")
+            return self._executor
+
+    def submit(self, ds, index=None):
+        """Decode on the shared pool; returns a Future of the pixel array"""
+        return self.executor.submit(self.decode, ds, index)
+
+    def decode_frames(self, ds):
+        """Pixel array of ``ds``, decoding the frames of a multi-frame study in parallel"""
+        count = num_frames(ds)
+        if count == 1 or self.max_workers == 1 or not ds.file_meta.TransferSyntaxUID.is_compressed:
+            return self.decode(ds)
+
+        frames = None
+        for index, frame in self.iter_frames(ds):
+            if frames is None:
+                frames = np.empty((count,) + frame.shape, dtype=frame.dtype)
+            frames[index] = frame
+        return frames
+
+    def iter_frames(self, ds, readahead=None):
+        """Yield ``(index, frame)`` for every frame of ``ds`` without materializing the whole pixel array.
+
+        Up to ``readahead`` frames (default: one per pool thread) are decoded
+        ahead on the pool, so at most ``readahead + 1`` decoded frames exist
+        at any time regardless of the frame count.
+        """
+        count = num_frames(ds)
+        readahead = self.max_workers if readahead is None else readahead
+        if count == 1:
+            yield 0, self.decode(ds)
+            return
+        if readahead <= 0:
+            for index in range(count):
+                yield index, self.decode(ds, index)
+            return
+
+        # Uncompressed data on disk: every frame is a memmap view, read only when it is used
+        native = self.native_pixels(ds)
+        if native is not None:
+            for index in range(count):
+                frame = native[index]
+                yield index, frame if _stored_bits_clean(frame, ds) else self.decode(ds, index)
+            return
+
+        # Load deferred pixel data once before the frames are decoded concurrently
+        ds.PixelData
+        pending = deque()
+        for index in range(count):
+            pending.append((index, self.submit(ds, index)))
+            if len(pending) > readahead:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+DECODERS = DecoderRegistry()
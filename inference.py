@@ -0,0 +1,669 @@
+import atexit
+import collections
+import contextlib
+import itertools
+import multiprocessing.connection
+import os
+import queue
+import subprocess
+import threading
+import sys
+import time
+from concurrent.futures import Future, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Model and batching configuration (overridable per deployment)
+MODEL_PATH = os.environ.get(
+    "PULMOVISTA_MODEL_PATH", "model_inc_V3_50d_ADAM_sq_aug_score3_Female_os_nos_8b.h5"
+)
+BACKEND = os.environ.get("PULMOVISTA_BACKEND", "keras")
+MODEL_VERSION = os.environ.get(
+    "PULMOVISTA_MODEL_VERSION", f"{os.path.basename(MODEL_PATH)}:{BACKEND}"
+)
+IMG_SIZE = 299
+# InceptionV3 takes RGB; inputs stay a single grey plane until the model's own first op
+MODEL_CHANNELS = 3
+MAX_BATCH_SIZE = int(os.environ.get("PULMOVISTA_MAX_BATCH_SIZE", "8"))
+MAX_WAIT_MS = float(os.environ.get("PULMOVISTA_MAX_WAIT_MS", "25"))
+# Inference worker processes per node; 0 runs the model in the server process
+INFERENCE_WORKERS = int(os.environ.get("PULMOVISTA_INFERENCE_WORKERS", "1"))
+CLASS_NAMES = [
+    name.strip() for name in os.environ.get("PULMOVISTA_CLASS_NAMES", "").split(",") if name.strip()
+]
+
+
+def batch_buckets(max_batch_size=MAX_BATCH_SIZE):
+    """Batch sizes the serving function is warmed up for (powers of two up to the maximum)"""
+    sizes = []
+    size = 1
+    while size < max_batch_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max(1, int(max_batch_size)))
+    return sizes
+
+
+class ServingModel:
+    """Keras model wrapped in a tf.function with a fixed input signature.
+
+    The graph is traced once for ``(None, 299, 299)`` float32 grey inputs,
+    so varying batch sizes never trigger a retrace; the plane is broadcast to
+    the model's three channels inside the graph. ``retrace_count`` counts
+    any trace after the first and should stay at zero in production.
+    """
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        self.trace_count = 0
+
+        @tf.function(input_signature=[tf.TensorSpec((None, IMG_SIZE, IMG_SIZE), tf.float32)])
+        def serve(images):
+            # Python side effects only run while tracing
+            self.trace_count += 1
+            images = tf.repeat(images[..., tf.newaxis], MODEL_CHANNELS, axis=-1)
+            return model(images, training=False)
+
+        self._serve = serve
+
+    @property
+    def retrace_count(self):
+        return max(0, self.trace_count - 1)
+
+    def __call__(self, batch):
+        return self._serve(np.asarray(batch, dtype=np.float32)).numpy()
+
+    def warm_up(self, batch_sizes):
+        """Run dummy batches so the first real request does not pay for tracing"""
+        for size in batch_sizes:
+            self(np.zeros((size, IMG_SIZE, IMG_SIZE), dtype=np.float32))
+
+
+def load_keras_model(model_path=MODEL_PATH):
+    """Load the Keras model from its HDF5 file"""
+    import tensorflow as tf
+
+    return tf.keras.models.load_model(model_path, compile=False)
+
+
+def quantized_path_for(model_path, backend):
+    """Location of the converted model file for a quantized backend"""
+    stem = os.path.splitext(model_path)[0]
+    return {
+        'tflite-fp16': stem + ".fp16.tflite",
+        'tflite-int8': stem + ".int8.tflite",
+        'onnx': stem + ".onnx",
+    }[backend]
+
+
+def export_tflite(model_path=MODEL_PATH, backend='tflite-fp16', calibration_images=None, output_path=None):
+    """Post-training quantize the model to a float16 or int8 TFLite flatbuffer.
+
+    int8 needs ``calibration_images``, an iterable of (299, 299) float32
+    grey planes (see preprocess) used to estimate activation ranges. Inputs and outputs stay
+    float32 so the backend is a drop-in replacement for the Keras model.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_keras_model(model_path))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if backend == 'tflite-fp16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif backend == 'tflite-int8':
+        if calibration_images is None:
+            raise ValueError("int8 quantization requires calibration images")
+        calibration_images = list(calibration_images)
+        converter.representative_dataset = lambda: ([to_model_channels(image[np.newaxis])]
+                                                     for image in calibration_images)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    else:
+        raise ValueError(f"Unknown TFLite backend: {backend}")
+
+    output_path = output_path or quantized_path_for(model_path, backend)
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    return output_path
+
+
+def export_onnx(model_path=MODEL_PATH, output_path=None):
+    """Convert the Keras model to ONNX (requires tf2onnx)"""
+    import tensorflow as tf
+    import tf2onnx
+
+    output_path = output_path or quantized_path_for(model_path, 'onnx')
+    signature = (tf.TensorSpec((None, IMG_SIZE, IMG_SIZE, MODEL_CHANNELS), tf.float32, name="images"),)
+    tf2onnx.convert.from_keras(load_keras_model(model_path), input_signature=signature, output_path=output_path)
+    return output_path
+
+
+class TFLiteModel:
+    """TFLite interpreter backend with one allocated interpreter per batch size"""
+
+    retrace_count = 0
+
+    def __init__(self, tflite_path, num_threads=None):
+        self.tflite_path = tflite_path
+        self.num_threads = num_threads or os.cpu_count()
+        self._interpreters = {}
+
+    def _interpreter(self, batch_size):
+        import tensorflow as tf
+
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            interpreter = tf.lite.Interpreter(model_path=self.tflite_path, num_threads=self.num_threads)
+            input_index = interpreter.get_input_details()[0]['index']
+            interpreter.resize_tensor_input(input_index, [batch_size, IMG_SIZE, IMG_SIZE, MODEL_CHANNELS])
+            interpreter.allocate_tensors()
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+    def __call__(self, batch):
+        batch = to_model_channels(batch)
+        interpreter = self._interpreter(len(batch))
+        interpreter.set_tensor(interpreter.get_input_details()[0]['index'], batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+
+    def warm_up(self, batch_sizes):
+        for size in batch_sizes:
+            self(np.zeros((size, IMG_SIZE, IMG_SIZE), dtype=np.float32))
+
+
+class OnnxModel:
+    """ONNX Runtime backend (requires onnxruntime)"""
+
+    retrace_count = 0
+
+    def __init__(self, onnx_path):
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        return self.session.run(None, {self.input_name: to_model_channels(batch)})[0]
+
+    def warm_up(self, batch_sizes):
+        for size in batch_sizes:
+            self(np.zeros((size, IMG_SIZE, IMG_SIZE), dtype=np.float32))
+
+
+BACKENDS = ('keras', 'tflite-fp16', 'tflite-int8', 'onnx')
+
+
+def load_model(model_path=MODEL_PATH, warm_up_batch_sizes=None, backend=BACKEND, num_threads=None):
+    """Load the InceptionV3 classifier on the selected backend and return it warmed up"""
+    if backend == 'keras':
+        if num_threads:
+            import tensorflow as tf
+
+            tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        model = ServingModel(load_keras_model(model_path))
+    elif backend in BACKENDS:
+        converted_path = quantized_path_for(model_path, backend)
+        if not os.path.exists(converted_path):
+            raise FileNotFoundError(
+                f"{converted_path} not found; create it with: python convert_model.py --format {backend}")
+        model = OnnxModel(converted_path) if backend == 'onnx' else TFLiteModel(converted_path, num_threads)
+    else:
+        raise ValueError(f"Unknown backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+    model.warm_up(warm_up_batch_sizes or batch_buckets())
+    return model
+
+
+def class_names(num_classes):
+    """Return display names for the model's output classes"""
+    if len(CLASS_NAMES) == num_classes:
+        return list(CLASS_NAMES)
+    return [f"Class {i}" for i in range(num_classes)]
+
+
+def preprocess(image):
+    """Convert a PIL image to a float32 (299, 299) grey model input"""
+    if image.mode != 'L':
+        image = image.convert('L')
+    image = image.resize((IMG_SIZE, IMG_SIZE))
+    return np.asarray(image, dtype=np.float32) / 255.0
+
+
+def to_model_channels(batch):
+    """Broadcast a (N, 299, 299) grey batch to the (N, 299, 299, 3) tensor the exported models take"""
+    batch = np.asarray(batch, dtype=np.float32)
+    if batch.ndim == 4:
+        return batch
+    return np.ascontiguousarray(np.broadcast_to(batch[..., np.newaxis], batch.shape + (MODEL_CHANNELS,)))
+
+
+def to_probabilities(outputs):
+    """Turn raw model outputs into per-class probabilities"""
+    outputs = np.asarray(outputs, dtype=np.float32)
+    if outputs.shape[-1] == 1:
+        # Single sigmoid unit: expand to [negative, positive]
+        return np.concatenate([1.0 - outputs, outputs], axis=-1)
+    row_sums = outputs.sum(axis=-1, keepdims=True)
+    if np.all(outputs >= 0) and np.allclose(row_sums, 1.0, atol=1e-3):
+        return outputs
+    # Logits: apply a numerically stable softmax
+    exp = np.exp(outputs - outputs.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def predict_stream(engine, inputs, max_in_flight=None, progress=None):
+    """Mean probabilities over an iterable of model inputs, e.g. the frames of a multi-frame study.
+
+    Inputs are pulled lazily and at most ``max_in_flight`` are queued on the
+    engine at once (default: two batches), so memory stays constant however
+    long the stream is while the engine still runs full micro-batches.
+    ``progress`` is called with the number of inputs finished so far.
+    """
+    max_in_flight = max(1, max_in_flight or 2 * getattr(engine, 'max_batch_size', MAX_BATCH_SIZE))
+    in_flight = collections.deque()
+    total = None
+    count = 0
+
+    def finish_oldest():
+        nonlocal total, count
+        probabilities = np.asarray(in_flight.popleft().result(), dtype=np.float64)
+        total = probabilities if total is None else total + probabilities
+        count += 1
+        if progress is not None:
+            progress(count)
+
+    for array in inputs:
+        in_flight.append(engine.submit(array))
+        if len(in_flight) >= max_in_flight:
+            finish_oldest()
+    while in_flight:
+        finish_oldest()
+    if count == 0:
+        raise ValueError("No images to analyze")
+    return (total / count).astype(np.float32)
+
+
+class InferenceEngine:
+    """Shared model runner that groups concurrent requests into micro-batches.
+
+    Callers from any thread (e.g. every Streamlit session) submit single
+    preprocessed images; a background thread collects up to
+    ``max_batch_size`` of them, waiting at most ``max_wait_ms`` after the
+    first one arrives, and runs them through the model in one call.
+    """
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.buckets = batch_buckets(self.max_batch_size)
+        self.batches_run = 0
+        self.images_run = 0
+        # Seconds spent inside the model; divided by wall time this is the model's utilization
+        self.busy_seconds = 0.0
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, array):
+        """Queue one (299, 299) float32 grey image; returns a Future of its probabilities"""
+        if self._closed.is_set():
+            raise RuntimeError("Inference engine is closed")
+        future = Future()
+        self._queue.put((np.asarray(array, dtype=np.float32), future))
+        return future
+
+    def predict(self, array, timeout=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(array).result(timeout=timeout)
+
+    @property
+    def retrace_count(self):
+        return getattr(self.model, 'retrace_count', 0)
+
+    def close(self):
+        self._closed.set()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self):
+        item = self._queue.get()
+        if item is None:
+            return []
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._closed.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            batch = [(array, future) for array, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            arrays = [array for array, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                # Pad up to a warmed-up bucket size so every batch shape is already primed
+                size = next(bucket for bucket in self.buckets if bucket >= len(arrays))
+                inputs = np.zeros((size, IMG_SIZE, IMG_SIZE), dtype=np.float32)
+                inputs[:len(arrays)] = arrays
+                model_start = time.perf_counter()
+                outputs = self.model(inputs)
+                self.busy_seconds += time.perf_counter() - model_start
+                probabilities = to_probabilities(outputs[:len(arrays)])
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches_run += 1
+            self.images_run += len(futures)
+            for future, row in zip(futures, probabilities):
+                future.set_result(row)
+
+
+# Started by InferenceWorkerPool as a script of its own, see the module docstring there
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inference_worker.py")
+# How often the pool's collector checks that its workers are still alive, in seconds
+WORKER_POLL_SECONDS = 0.5
+
+
+class _Worker:
+    """One inference worker process, its connection and the number of requests it holds"""
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.in_flight = 0
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        with self._send_lock:
+            self.connection.send(message)
+
+    def stop(self, timeout=10):
+        """Ask the worker to exit and kill it if it has not after ``timeout`` seconds"""
+        with contextlib.suppress(OSError, ValueError):
+            self.send(None)
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class InferenceWorkerPool:
+    """Pool of inference worker processes sharing input buffers with the server.
+
+    Exposes the same submit()/predict() interface as InferenceEngine, but the
+    model runs in ``num_workers`` separate processes so prediction never holds
+    the server's GIL. Inputs are copied once into a ring of shared-memory
+    slots; only slot numbers and probabilities cross the process boundary.
+    submit() blocks when every slot is in flight, which bounds memory.
+
+    Workers run inference_worker.py and each gets requests over its own
+    connection, least busy first. A worker that dies fails the requests it
+    held, gives their slots back and is replaced by a new one.
+    """
+
+    def __init__(self, num_workers=INFERENCE_WORKERS, model_path=MODEL_PATH, backend=BACKEND,
+                 max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, num_slots=None, startup_timeout=600):
+        self.num_workers = max(1, int(num_workers))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.num_slots = num_slots or self.num_workers * max_batch_size * 2
+        self.startup_timeout = startup_timeout
+        self.retrace_count = 0
+        self.restarts = 0
+        slot_bytes = IMG_SIZE * IMG_SIZE * np.dtype(np.float32).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=self.num_slots * slot_bytes)
+        self._slots = np.ndarray((self.num_slots, IMG_SIZE, IMG_SIZE), dtype=np.float32, buffer=self._shm.buf)
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+        # request id -> (future, slot, worker)
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Notified when a replacement worker is ready, or failed to start
+        self._changed = threading.Condition(self._lock)
+        self._ids = itertools.count()
+        self._closed = False
+        self._authkey = os.urandom(32)
+        self._config = {
+            'shm_name': self._shm.name, 'num_slots': self.num_slots, 'model_path': model_path, 'backend': backend,
+            'max_batch_size': max_batch_size, 'max_wait_ms': max_wait_ms,
+            'num_threads': max(1, (os.cpu_count() or 1) // self.num_workers)
+        }
+        # Workers serving requests, and the number of replacements still loading their model
+        self._workers = []
+        self._starting = 0
+        atexit.register(self.close)
+
+        # Start every worker, then wait until each has loaded and warmed up its model
+        starting = []
+        try:
+            for _ in range(self.num_workers):
+                starting.append(self._launch())
+            for worker in starting:
+                self._wait_ready(worker)
+        except Exception:
+            for worker in starting:
+                worker.stop(timeout=0)
+                worker.connection.close()
+            self.close()
+            raise
+        self._workers = starting
+
+        self._collector = threading.Thread(target=self._collect, name="inference-results", daemon=True)
+        self._collector.start()
+
+    def submit(self, array):
+        """Queue one (299, 299) float32 grey image; returns a Future of its probabilities"""
+        if self._closed:
+            raise RuntimeError("Inference worker pool is closed")
+        slot = self._free_slots.get()
+        self._slots[slot] = array
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            # Every worker died at once: wait for a replacement
+            while not self._workers and self._starting and not self._closed:
+                self._changed.wait()
+            if not self._workers:
+                self._free_slots.put(slot)
+                raise RuntimeError("Inference worker pool is closed" if self._closed
+                                   else "No inference worker is running")
+            worker = min(self._workers, key=lambda w: w.in_flight)
+            worker.in_flight += 1
+            self._pending[request_id] = (future, slot, worker)
+        try:
+            worker.send((request_id, slot))
+        except (OSError, ValueError):
+            # The worker just died; the collector fails this request along with its others
+            pass
+        return future
+
+    def predict(self, array, timeout=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(array).result(timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            self._changed.notify_all()
+        # Workers answer the requests they hold before exiting, and the collector delivers the answers
+        for worker in workers:
+            worker.stop()
+        collector = getattr(self, '_collector', None)
+        if collector is not None and collector is not threading.current_thread():
+            collector.join(timeout=10)
+        for worker in workers:
+            worker.connection.close()
+        with self._lock:
+            self._workers.clear()
+            for future, _, _ in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("Inference worker pool was closed"))
+            self._pending.clear()
+        del self._slots
+        self._shm.close()
+        self._shm.unlink()
+
+    def _launch(self):
+        """Start a worker process and send it its configuration; it then loads the model"""
+        with multiprocessing.connection.Listener(authkey=self._authkey) as listener:
+            process = subprocess.Popen([sys.executable, WORKER_SCRIPT, listener.address], stdin=subprocess.PIPE)
+            process.stdin.write(self._authkey.hex().encode() + b"\n")
+            process.stdin.close()
+            connection = self._accept(listener, process)
+        connection.send(self._config)
+        return _Worker(process, connection)
+
+    def _accept(self, listener, process):
+        """The connection of a starting worker; accept() has no timeout, so the process is watched meanwhile"""
+        accepted = Future()
+
+        def accept():
+            try:
+                accepted.set_result(listener.accept())
+            except Exception as e:
+                accepted.set_exception(e)
+
+        threading.Thread(target=accept, name="inference-accept", daemon=True).start()
+        deadline = time.monotonic() + self.startup_timeout
+        while not wait([accepted], timeout=WORKER_POLL_SECONDS).done:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                process.wait()
+                # Wake the accepting thread; nothing else connects to this listener
+                with contextlib.suppress(Exception):
+                    multiprocessing.connection.Client(listener.address, authkey=self._authkey).close()
+                raise RuntimeError(f"Inference worker did not connect (exit code {process.returncode})")
+        return accepted.result()
+
+    def _wait_ready(self, worker):
+        """Wait until a launched worker has loaded and warmed up its model"""
+        try:
+            if worker.connection.poll(self.startup_timeout):
+                kind, _, message = worker.connection.recv()
+                if kind == 'ready':
+                    return
+            else:
+                message = "timed out waiting for inference workers to start"
+        except (EOFError, OSError):
+            message = f"exited with code {worker.process.wait()}"
+        worker.stop(timeout=0)
+        worker.connection.close()
+        raise RuntimeError(f"Inference worker failed to start: {message}")
+
+    def _collect(self):
+        while True:
+            with self._lock:
+                workers = list(self._workers)
+            if not workers:
+                if self._closed:
+                    return
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+            connections = {worker.connection: worker for worker in workers}
+            for connection in multiprocessing.connection.wait(list(connections), timeout=WORKER_POLL_SECONDS):
+                worker = connections[connection]
+                try:
+                    kind, request_id, payload = connection.recv()
+                except (EOFError, OSError):
+                    self._replace(worker)
+                    continue
+                with self._lock:
+                    future, slot, _ = self._pending.pop(request_id, (None, None, None))
+                    if future is not None:
+                        worker.in_flight -= 1
+                if future is None:
+                    continue
+                self._free_slots.put(slot)
+                if kind == 'result':
+                    probabilities, retrace_count = payload
+                    self.retrace_count = max(self.retrace_count, retrace_count)
+                    future.set_result(probabilities)
+                else:
+                    future.set_exception(RuntimeError(payload))
+            # A worker that exits hangs up and is noticed above, once its last answers are read; this catches
+            # one whose connection outlives it (inherited by a child process of its own)
+            for worker in workers:
+                if worker.connection.closed or worker.process.poll() is None:
+                    continue
+                if not worker.connection.poll():
+                    self._replace(worker)
+
+    def _replace(self, worker):
+        """Fail the requests of a worker that exited, give their slots back and start a replacement"""
+        with self._lock:
+            if worker not in self._workers:
+                return
+            self._workers.remove(worker)
+            lost = [request_id for request_id, (_, _, owner) in self._pending.items() if owner is worker]
+            lost = [self._pending.pop(request_id) for request_id in lost]
+            restart = not self._closed
+            if restart:
+                self._starting += 1
+        # Also stops a worker whose connection broke while it still runs, before its slots are reused
+        worker.process.kill()
+        worker.process.wait()
+        worker.connection.close()
+        if restart:
+            error = RuntimeError(f"Inference worker {worker.process.pid} exited with code {worker.process.returncode}")
+            print(f"{error}; starting a replacement", file=sys.stderr)
+        else:
+            error = RuntimeError("Inference worker pool was closed")
+        for future, slot, _ in lost:
+            self._free_slots.put(slot)
+            if not future.done():
+                future.set_exception(error)
+        if restart:
+            threading.Thread(target=self._restart, name="inference-restart", daemon=True).start()
+
+    def _restart(self):
+        worker = None
+        try:
+            if not self._closed:
+                worker = self._launch()
+                self._wait_ready(worker)
+        except Exception as e:
+            print(f"Could not replace the inference worker: {e}", file=sys.stderr)
+            worker = None
+        with self._lock:
+            self._starting -= 1
+            if worker is not None and not self._closed:
+                self._workers.append(worker)
+                self.restarts += 1
+                worker = None
+            self._changed.notify_all()
+        if worker is not None:
+            worker.stop()
+            worker.connection.close()
+
+
+def create_engine(num_workers=INFERENCE_WORKERS, model_path=MODEL_PATH, backend=BACKEND,
+                  max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    """Build the configured inference engine: a worker pool, or in-process when num_workers is 0"""
+    if num_workers > 0:
+        return InferenceWorkerPool(num_workers, model_path, backend, max_batch_size, max_wait_ms)
+    return InferenceEngine(load_model(model_path, batch_buckets(max_batch_size), backend=backend),
+                           max_batch_size, max_wait_ms)
@@ -0,0 +1,80 @@
+"""Entry point of an inference worker process started by inference.InferenceWorkerPool.
+
+The pool runs ``python inference_worker.py ADDRESS`` and writes its authkey
+to the worker's stdin. Workers are not started with multiprocessing's spawn
+method, which re-imports the parent's __main__ in the child: under
+``streamlit run`` that is the whole app page, and hiding it would mean
+swapping sys.modules['__main__'] under the app's own script threads.
+
+The worker connects back before importing anything heavy, loads the model
+and micro-batches tasks with its own InferenceEngine. Tasks are
+(request_id, slot) pairs naming a preprocessed image already written into
+the pool's shared-memory slot array; None asks the worker to exit.
+"""
+import os
+import signal
+import sys
+import threading
+from multiprocessing.connection import Client
+
+
+def main():
+    # The pool shuts its workers down; Ctrl+C in the server's terminal reaches the whole process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    connection = Client(sys.argv[1], authkey=authkey)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            connection.send(message)
+
+    config = connection.recv()
+    try:
+        import numpy as np
+        from multiprocessing import resource_tracker, shared_memory
+
+        from inference import IMG_SIZE, InferenceEngine, batch_buckets, load_model
+
+        model = load_model(config['model_path'], batch_buckets(config['max_batch_size']), backend=config['backend'],
+                           num_threads=config['num_threads'])
+        engine = InferenceEngine(model, config['max_batch_size'], config['max_wait_ms'])
+        shm = shared_memory.SharedMemory(name=config['shm_name'])
+        if os.name == 'posix':
+            # Attaching registers the segment with this process's resource tracker, which would unlink it
+            # when the worker exits; the pool owns it
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        slots = np.ndarray((config['num_slots'], IMG_SIZE, IMG_SIZE), dtype=np.float32, buffer=shm.buf)
+    except Exception as e:
+        send(('failed', os.getpid(), f"{type(e).__name__}: {e}"))
+        return
+    send(('ready', os.getpid(), None))
+
+    def reply(request_id, future):
+        try:
+            message = ('result', request_id, (future.result(), engine.retrace_count))
+        except Exception as e:
+            message = ('error', request_id, f"{type(e).__name__}: {e}")
+        try:
+            send(message)
+        except OSError:
+            # The pool is gone; the main loop sees the closed connection too
+            pass
+
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        request_id, slot = task
+        engine.submit(slots[slot]).add_done_callback(lambda future, request_id=request_id: reply(request_id, future))
+    engine.close()
+    del slots
+    shm.close()
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
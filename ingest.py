@@ -0,0 +1,154 @@
+"""Streaming study ingest from ZIP archives, DICOMDIR folders and plain folders.
+
+Entries are listed from the ZIP central directory, the DICOMDIR records or
+a directory walk without reading any file contents. Each entry is opened as
+a (decompressing) stream only when the pipeline asks for it, so nothing is
+extracted to disk and memory stays bounded however large the archive is.
+"""
+import functools
+import os
+import posixpath
+import zipfile
+
+DICOMDIR_NAME = "DICOMDIR"
+# Archive members that are never studies (macOS resource forks)
+IGNORED_PREFIXES = ("__MACOSX/",)
+# ZIP archives each worker process keeps open for entries sent to it
+OPEN_ARCHIVES = 16
+
+
+class ArchiveEntry:
+    """One file in an archive or folder; ``open()`` returns a fresh binary stream.
+
+    Entries listed from a path remember their ``location`` (archive or
+    folder path, member name) and can be pickled to worker processes, which
+    reopen the archive themselves.
+    """
+
+    def __init__(self, name, opener, size=None, location=None):
+        self.name = name
+        self.size = size
+        self.location = location
+        self._opener = opener
+
+    def open(self):
+        return self._opener()
+
+    def __reduce__(self):
+        if self.location is None:
+            raise TypeError(f"{self.name} was listed from a file object and cannot be sent to another process")
+        return _reopen_entry, (self.name, self.size) + tuple(self.location)
+
+    def __repr__(self):
+        return f"ArchiveEntry({self.name!r})"
+
+
+def is_archive(source):
+    """True for a folder, a DICOMDIR file or a ZIP archive (path or file object)"""
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.isdir(source) or os.path.basename(source).upper() == DICOMDIR_NAME:
+            return True
+    elif getattr(source, 'name', '').lower().endswith('.zip'):
+        return True
+    return zipfile.is_zipfile(source)
+
+
+def list_entries(source, label=None):
+    """Studies in ``source`` (a folder, DICOMDIR path, ZIP path or ZIP file object), in order.
+
+    When a DICOMDIR is present only the files its records reference are
+    listed, in record order; otherwise every file is. Entry names are
+    relative to the archive, prefixed with ``label`` if given. A path to any
+    other file is listed as a single entry named ``label`` or the path.
+    """
+    location = None
+    if isinstance(source, (str, os.PathLike)):
+        location = os.fspath(source)
+        if os.path.isfile(location) and not zipfile.is_zipfile(location) \
+                and os.path.basename(location).upper() != DICOMDIR_NAME:
+            directory, member = os.path.split(location)
+            return [_reopen_entry(label or location, os.path.getsize(location), directory or ".", member)]
+    if location is not None and not zipfile.is_zipfile(location):
+        if not os.path.isdir(location):
+            location = os.path.dirname(location)
+        files = _folder_files(location)
+    else:
+        files = _zip_files(source)
+
+    names = {name.upper(): name for name in files}
+    dicomdir = next((name for name in files if posixpath.basename(name).upper() == DICOMDIR_NAME), None)
+    if dicomdir is None:
+        selected = sorted(files)
+    else:
+        with files[dicomdir][0]() as stream:
+            file_ids = dicomdir_file_ids(stream)
+        base = posixpath.dirname(dicomdir)
+        # File IDs are upper case by definition; the extracted names may not be
+        selected = [names.get(posixpath.join(base, file_id).upper(), posixpath.join(base, file_id))
+                    for file_id in file_ids]
+
+    prefix = f"{label}/" if label else ""
+    entries = []
+    for name in selected:
+        if name == dicomdir:
+            continue
+        opener, size = files.get(name, (_missing(name), None))
+        entries.append(ArchiveEntry(prefix + name, opener, size, None if location is None else (location, name)))
+    return entries
+
+
+def dicomdir_file_ids(stream):
+    """Relative paths of the files referenced by a DICOMDIR, in record order"""
+    import pydicom
+
+    dicomdir = pydicom.dcmread(stream)
+    paths = []
+    for record in dicomdir.get('DirectoryRecordSequence', []):
+        file_id = record.get('ReferencedFileID')
+        if file_id is None:
+            continue
+        parts = [file_id] if isinstance(file_id, str) else list(file_id)
+        paths.append("/".join(str(part).strip() for part in parts))
+    return paths
+
+
+def _reopen_entry(name, size, path, member):
+    """Rebuild an entry from its location, e.g. in a worker process"""
+    if os.path.isdir(path):
+        member_path = os.path.join(path, *member.split("/"))
+        return ArchiveEntry(name, lambda: open(member_path, 'rb'), size, (path, member))
+    return ArchiveEntry(name, lambda: _shared_archive(path).open(member), size, (path, member))
+
+
+@functools.lru_cache(maxsize=OPEN_ARCHIVES)
+def _shared_archive(path):
+    """One open ZipFile per archive and process; members can be read from several threads at once"""
+    return zipfile.ZipFile(path)
+
+
+def _zip_files(source):
+    """{member name: (opener, uncompressed size)}; the archive stays open while any opener is alive"""
+    archive = zipfile.ZipFile(source)
+    files = {}
+    for info in archive.infolist():
+        if info.is_dir() or info.filename.startswith(IGNORED_PREFIXES):
+            continue
+        files[info.filename] = (lambda info=info: archive.open(info), info.file_size)
+    return files
+
+
+def _folder_files(root):
+    """{relative posix path: (opener, size)} for every file under ``root``"""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, "/")
+            files[relative] = (lambda path=path: open(path, 'rb'), os.path.getsize(path))
+    return files
+
+
+def _missing(name):
+    def opener():
+        raise FileNotFoundError(f"{name} is listed in the DICOMDIR but missing from the archive")
+    return opener
@@ -0,0 +1,373 @@
+"""Persistent analysis jobs, so work survives page refreshes, reruns and server restarts.
+
+A job is an uploaded study spooled under JOB_DIR plus a row in a SQLite
+database in WAL mode, so the Home page can poll while runners write.
+submit() returns at once; poll with get() and read the report with
+result(). JobRunner threads claim queued jobs under a lease that their
+process keeps renewing. If the process dies the lease runs out and any
+runner (the restarted app, or another process on the same database) claims
+the job again; after MAX_ATTEMPTS claims it is failed instead of retried
+forever.
+
+Run workers without Streamlit with ``python job_store.py [--db PATH] [--job-dir DIR]``.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from imaging import DECODE_THREADS, SPOOL_CHUNK_BYTES, remove_quietly
+from inference import create_engine
+from prediction_cache import PredictionCache
+from processing import ImageProcessor, ImageRejected, StudyAnalysis
+
+JOB_DB_PATH = os.environ.get("PULMOVISTA_JOB_DB", os.path.join(".cache", "jobs.sqlite3"))
+JOB_DIR = os.environ.get("PULMOVISTA_JOB_DIR", os.path.join(".cache", "jobs"))
+# Seconds a claimed job stays leased; runners renew their leases every third of that
+LEASE_SECONDS = float(os.environ.get("PULMOVISTA_JOB_LEASE_SECONDS", "60"))
+MAX_ATTEMPTS = int(os.environ.get("PULMOVISTA_JOB_MAX_ATTEMPTS", "3"))
+# Finished jobs older than this are pruned when a runner starts
+JOB_RETENTION_HOURS = float(os.environ.get("PULMOVISTA_JOB_RETENTION_HOURS", "24"))
+# How often an idle runner looks for new jobs, and the least time between progress writes
+POLL_SECONDS = 0.2
+FINISHED = ('done', 'skipped', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    owner TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+"""
+# Added after the first release; databases created before it gain the column on open
+MIGRATIONS = {
+    'owner': "ALTER TABLE jobs ADD COLUMN owner TEXT",
+}
+INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_by_owner ON jobs (owner, created_at);
+"""
+
+
+class JobStore:
+    """Submit, poll and lease analysis jobs in SQLite; safe to share between threads and processes"""
+
+    def __init__(self, path=JOB_DB_PATH, job_dir=JOB_DIR):
+        # Absolute, so the spool paths stored in the database resolve from any runner's working directory
+        self.path = os.path.abspath(path)
+        self.job_dir = os.path.abspath(job_dir)
+        os.makedirs(self.job_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(jobs)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                connection.execute(statement)
+        connection.executescript(INDEXES)
+
+    def _connection(self):
+        """One connection per thread, in autocommit mode; writes that must be atomic use _transaction()"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Commits survive a crash of the app; only a power loss can drop the last few
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['progress'] = json.loads(job['progress']) if job['progress'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def submit(self, source, name, owner=None):
+        """Spool ``source`` (an upload or binary stream) under job_dir and queue it; returns the job id.
+
+        ``owner`` identifies who submitted it (the Home page passes its session
+        id), so recent() lists a session's own studies and nobody else's.
+        """
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.job_dir, f"{job_id}.dcm")
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with open(path, 'wb') as spool:
+            shutil.copyfileobj(source, spool, SPOOL_CHUNK_BYTES)
+            spool.flush()
+            os.fsync(spool.fileno())
+        now = time.time()
+        try:
+            self._connection().execute(
+                "INSERT INTO jobs (id, name, path, owner, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, name, path, owner, now, now))
+        except Exception:
+            remove_quietly(path)
+            raise
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict, with ``progress`` and ``result`` decoded; None if unknown"""
+        return self._job(self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def result(self, job_id):
+        """Report data of a finished job, or None while it is queued, running, skipped or failed"""
+        job = self.get(job_id)
+        return job['result'] if job is not None else None
+
+    def queued_before(self, job_id):
+        """Number of jobs waiting ahead of a queued job"""
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < "
+            "(SELECT created_at FROM jobs WHERE id = ?)", (job_id,)).fetchone()
+        return row[0]
+
+    def recent(self, owner, limit=10):
+        """The latest jobs submitted by ``owner``, newest first"""
+        rows = self._connection().execute("SELECT * FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?",
+                                          (owner, limit))
+        return [self._job(row) for row in rows]
+
+    def counts(self):
+        """{status: number of jobs}"""
+        return dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def claim(self, owner, lease_seconds=LEASE_SECONDS):
+        """Lease the oldest runnable job to ``owner`` and return it, or None if there is none.
+
+        A job is runnable while queued, or while running under a lease that
+        has expired because its runner died.
+        """
+        abandoned = []
+        try:
+            with self._transaction() as connection:
+                while True:
+                    now = time.time()
+                    row = connection.execute(
+                        "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_expires < ?) "
+                        "ORDER BY created_at LIMIT 1", (now,)).fetchone()
+                    if row is None:
+                        return None
+                    if row['attempts'] < MAX_ATTEMPTS:
+                        break
+                    connection.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires = NULL, "
+                        "updated_at = ? WHERE id = ?",
+                        (f"Gave up after {row['attempts']} attempts", now, row['id']))
+                    abandoned.append(row['path'])
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                    "progress = NULL, updated_at = ? WHERE id = ?", (owner, now + lease_seconds, now, row['id']))
+        finally:
+            for path in abandoned:
+                remove_quietly(path)
+        return self.get(row['id'])
+
+    def renew(self, owner, lease_seconds=LEASE_SECONDS):
+        """Extend every lease ``owner`` holds; returns how many jobs it holds"""
+        return self._connection().execute(
+            "UPDATE jobs SET lease_expires = ? WHERE lease_owner = ? AND status = 'running'",
+            (time.time() + lease_seconds, owner)).rowcount
+
+    def report_progress(self, job_id, owner, progress):
+        self._connection().execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (json.dumps(progress), time.time(), job_id, owner))
+
+    def finish(self, job_id, owner, status, result=None, error=None):
+        """Record the outcome if ``owner`` still holds the lease; False if another runner took the job over"""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT path FROM jobs WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                                     (job_id, owner)).fetchone()
+            if row is None:
+                return False
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id))
+        remove_quietly(row['path'])
+        return True
+
+    def prune(self, max_age_seconds=JOB_RETENTION_HOURS * 3600):
+        """Delete finished jobs older than ``max_age_seconds``; returns how many"""
+        placeholders = ", ".join("?" for _ in FINISHED)
+        return self._connection().execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+            FINISHED + (time.time() - max_age_seconds,)).rowcount
+
+
+class JobRunner:
+    """Worker threads that claim jobs from a JobStore and analyze them on ``engine``.
+
+    Each thread runs one job at a time and waits for its prediction, so the
+    engine batches up to ``workers`` studies together. A heartbeat thread
+    renews the leases of every job this runner holds.
+
+    Jobs queued with submit() can hand over the study the caller already
+    decoded (the Home page decodes it for the preview), so a job run by this
+    process does not decode it again. Jobs claimed after a restart, by
+    another process or on a later attempt decode the spooled file.
+    """
+
+    def __init__(self, store, engine, cache=None, workers=DECODE_THREADS, lease_seconds=LEASE_SECONDS):
+        self.store = store
+        self.engine = engine
+        self.cache = cache
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        # job id -> DecodedImage handed over by submit(), until a worker claims the job
+        self._decoded = OrderedDict()
+        self._decoded_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        self._threads.append(threading.Thread(target=self._heartbeat, name="job-leases", daemon=True))
+
+    def start(self):
+        self.store.prune()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, source, name, owner=None, decoded=None):
+        """Queue ``source`` on the store, keeping its DecodedImage for whichever worker here claims it"""
+        job_id = self.store.submit(source, name, owner)
+        if decoded is not None:
+            with self._decoded_lock:
+                self._decoded[job_id] = decoded
+                # Jobs claimed by another process never come back for theirs
+                while len(self._decoded) > 2 * len(self._threads):
+                    self._decoded.popitem(last=False)
+        return job_id
+
+    def stop(self):
+        """Stop claiming jobs and wait for the running ones"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.store.renew(self.owner, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"Could not renew job leases: {e}", file=sys.stderr)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(self.owner, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"Could not claim a job: {e}", file=sys.stderr)
+                job = None
+            if job is None:
+                self._stop.wait(POLL_SECONDS)
+                continue
+            self.run(job)
+
+    def run(self, job):
+        """Analyze one claimed job and record its outcome"""
+        start_time = time.perf_counter()
+        progress = {'stages': {}, 'frames': 1, 'frames_done': 0}
+        last_write = [0.0]
+
+        def save_progress(force=True):
+            if force or time.perf_counter() - last_write[0] >= POLL_SECONDS:
+                last_write[0] = time.perf_counter()
+                self.store.report_progress(job['id'], self.owner, progress)
+
+        def report_stage(stage, seconds):
+            progress['stages'][stage] = round(seconds * 1000, 1)
+            save_progress()
+
+        def report_frames(done):
+            progress['frames_done'] = done
+            save_progress(force=False)
+
+        with self._decoded_lock:
+            decoded = self._decoded.pop(job['id'], None)
+        try:
+            if decoded is None:
+                decoded = ImageProcessor.load(job['path'], report_stage, previews=False, dicom=True)
+            else:
+                # The stages ran when the caller decoded the study; show what they took there
+                progress['stages'].update((stage, round(seconds * 1000, 1))
+                                          for stage, seconds in decoded.timings.items())
+            analysis = StudyAnalysis(decoded, self.cache, start_time)
+            if analysis.hit:
+                report = analysis.report()
+            else:
+                submitted_at = time.perf_counter()
+                progress['frames'] = decoded.frames
+                probabilities = analysis.submit(self.engine, progress=report_frames).result()
+                ImageProcessor.stage_done(report_stage, 'predict', submitted_at)
+                report = analysis.report(probabilities)
+            outcome = {'status': 'done', 'result': report}
+        except ImageRejected as e:
+            outcome = {'status': 'skipped', 'error': str(e)}
+        except Exception as e:
+            outcome = {'status': 'failed', 'error': str(e)}
+        try:
+            self.store.finish(job['id'], self.owner, **outcome)
+        except sqlite3.Error as e:
+            # The lease runs out and the job is retried
+            print(f"Could not record job {job['id']}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued PulmoVista analysis jobs without Streamlit")
+    parser.add_argument("--db", default=JOB_DB_PATH, help="Job database shared with the app")
+    parser.add_argument("--job-dir", default=JOB_DIR, help="Folder the app spools submitted studies to")
+    parser.add_argument("--workers", type=int, default=DECODE_THREADS, help="Jobs analyzed at once")
+    args = parser.parse_args()
+
+    engine = create_engine()
+    store = JobStore(args.db, args.job_dir)
+    runner = JobRunner(store, engine, PredictionCache(), workers=args.workers).start()
+    print(f"Running jobs from {store.path} as {runner.owner}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
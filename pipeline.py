@@ -0,0 +1,102 @@
+"""tf.data-style stages for the batch scoring input pipeline.
+
+Each stage is a generator over the one before it, so a pipeline is lazy and
+bounded end to end:
+
+    studies = parallel_map(decode_study, entries, pool, num_parallel=16)
+    batches = prefetch(model_batches(studies, batch_size=8), buffer_size=2)
+
+parallel_map() keeps ``num_parallel`` calls running on an executor and, like
+``Dataset.map(deterministic=False)``, yields results as they finish unless
+``deterministic`` is set. prefetch() runs everything upstream of it on a
+background thread, up to ``buffer_size`` elements ahead of the consumer, so
+building the next batch overlaps with predicting this one.
+"""
+import collections
+import itertools
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Marks the end of a prefetched stream
+_END = object()
+
+
+def parallel_map(fn, iterable, executor, num_parallel, deterministic=False):
+    """Yield ``fn(item)`` for every item, with up to ``num_parallel`` calls running on ``executor``.
+
+    Items are pulled from ``iterable`` only as calls finish. An exception
+    raised by ``fn`` is re-raised to the consumer, as tf.data does.
+    """
+    items = iter(iterable)
+    num_parallel = max(1, num_parallel)
+    in_flight = collections.deque() if deterministic else set()
+    add = in_flight.append if deterministic else in_flight.add
+    try:
+        while True:
+            for item in itertools.islice(items, num_parallel - len(in_flight)):
+                add(executor.submit(fn, item))
+            if not in_flight:
+                return
+            if deterministic:
+                yield in_flight.popleft().result()
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                yield future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def prefetch(iterable, buffer_size):
+    """Iterate ``iterable`` on a background thread, at most ``buffer_size`` elements ahead of the consumer.
+
+    A buffer size of 0 iterates in the caller's thread. Exceptions raised
+    upstream are re-raised to the consumer; closing the generator stops the
+    background thread.
+    """
+    if buffer_size <= 0:
+        yield from iterable
+        return
+
+    buffer = queue.Queue(buffer_size)
+    stopped = threading.Event()
+
+    def put(element):
+        while not stopped.is_set():
+            try:
+                buffer.put(element, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        error = None
+        try:
+            for element in iterable:
+                if not put((element, None)):
+                    return
+        except BaseException as e:
+            error = e
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+        put((_END, error))
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            element, error = buffer.get()
+            if element is _END:
+                if error is not None:
+                    raise error
+                return
+            yield element
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Cache configuration (overridable per deployment)
+CACHE_DIR = os.environ.get("PULMOVISTA_CACHE_DIR", os.path.join(".cache", "predictions"))
+CACHE_MEMORY_ENTRIES = int(os.environ.get("PULMOVISTA_CACHE_MEMORY_ENTRIES", "256"))
+CACHE_DISK_MB = float(os.environ.get("PULMOVISTA_CACHE_DISK_MB", "256"))
+
+
+def content_key(pixels, model_version):
+    """Content address for a decoded image: hash of its pixels, shape and dtype plus the model version"""
+    pixels = np.ascontiguousarray(pixels)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{model_version}|{pixels.shape}|{pixels.dtype.str}|".encode())
+    digest.update(memoryview(pixels).cast('B'))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Two-tier cache of model output (per-class probabilities) keyed by content_key().
+
+    Only the prediction is cached, never a report: identical pixels can come
+    with different headers, so the caller builds each report from the study
+    it was given. The memory tier is an LRU of ``memory_entries``
+    predictions; the disk tier stores one JSON file per key under
+    ``cache_dir`` and evicts the least recently used files once their total
+    size exceeds ``disk_bytes``.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, memory_entries=CACHE_MEMORY_ENTRIES, disk_bytes=CACHE_DISK_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_usage = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_usage = sum(entry.stat().st_size for entry in os.scandir(cache_dir)
+                                   if entry.name.endswith(".json"))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached probabilities for ``key`` as a float32 array, or None on a miss"""
+        with self._lock:
+            probabilities = self._memory.get(key)
+            if probabilities is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return np.array(probabilities, dtype=np.float32)
+
+        probabilities = self._read_disk(key)
+        with self._lock:
+            if probabilities is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, probabilities)
+        return np.array(probabilities, dtype=np.float32)
+
+    def put(self, key, probabilities):
+        probabilities = [float(p) for p in np.ravel(probabilities)]
+        with self._lock:
+            self._remember(key, probabilities)
+        if self.cache_dir:
+            self._write_disk(key, probabilities)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    def _remember(self, key, probabilities):
+        self._memory[key] = probabilities
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                probabilities = json.load(f)
+            # Files written before only predictions were cached hold whole reports; treat them as misses
+            if not isinstance(probabilities, list):
+                return None
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+            return probabilities
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, probabilities):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(probabilities, f)
+            size = os.path.getsize(tmp_path)
+        except OSError:
+            return
+        with self._lock:
+            # Rewriting a key replaces a file whose size is already counted
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+            self._disk_usage += size
+            if self._disk_usage > self.disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        # Only scan the directory once the running total says we are over budget
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        # Trim to 90% of the budget so the next few writes don't trigger another scan
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_usage = total
@@ -0,0 +1,384 @@
+"""Study decoding and report building shared by the Streamlit app and the batch CLI.
+
+Nothing here imports Streamlit: failures raise ImageRejected or
+ImageLoadError instead of being shown on a page, so the same pipeline runs
+in final_file.py and in the worker processes of score_studies.py.
+"""
+import os
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+from imaging import DECODERS, num_frames, read_spooled_dicom, window_to_uint8, build_previews, pick_preview
+from inference import preprocess, predict_stream, class_names, MODEL_VERSION
+from ingest import list_entries
+from prediction_cache import content_key
+
+# Add DICOM support
+try:
+    import pydicom
+
+    DICOM_AVAILABLE = True
+except ImportError:
+    DICOM_AVAILABLE = False
+
+
+class ImageRejected(ValueError):
+    """The DICOM header shows the file is not a study the model can analyze"""
+
+
+class ImageLoadError(ValueError):
+    """An upload could not be read or decoded"""
+
+
+class NotDicomEntry(ImageLoadError):
+    """An archive entry that is not a DICOM file at all; batch ingest skips it"""
+
+
+@dataclass
+class DecodedImage:
+    """Result of reading an upload once: display image, model input, header fields and encoded previews"""
+    image: Image.Image
+    model_input: np.ndarray
+    info: dict = field(default_factory=dict)
+    previews: dict = field(default_factory=dict)
+    frames: int = 1
+    # Kept only for multi-frame studies, whose frames are streamed at analysis time
+    dataset: object = None
+    # Measured seconds of each load stage, so whoever analyzes the study later can show how it was decoded
+    timings: dict = field(default_factory=dict)
+
+    def preview(self, target_width=None):
+        """Encoded preview that best fits ``target_width`` (the results column by default)"""
+        if not self.previews:
+            return self.image
+        return pick_preview(self.previews, target_width or ImageProcessor.PREVIEW_COLUMN_WIDTH)
+
+    def content_pixels(self):
+        """Pixels identifying the study for the prediction cache (every frame of a multi-frame study)"""
+        if self.dataset is not None:
+            pixels = ImageProcessor.DECODERS.native_pixels(self.dataset)
+            return pixels if pixels is not None else np.frombuffer(self.dataset.PixelData, dtype=np.uint8)
+        return np.asarray(self.image)
+
+    @property
+    def nbytes(self):
+        """Memory held by the display image, model input and encoded previews"""
+        image_bytes = self.image.width * self.image.height * len(self.image.getbands())
+        return image_bytes + self.model_input.nbytes + sum(len(data) for data in self.previews.values())
+
+    def frame_inputs(self):
+        """Model inputs of every frame of a multi-frame study, decoded, windowed and preprocessed one at a time"""
+        for _, frame in ImageProcessor.DECODERS.iter_frames(self.dataset):
+            yield preprocess(ImageProcessor.frame_to_image(frame, self.dataset))
+
+
+class ImageProcessor:
+    # Pixel data decoder chosen per transfer syntax (shared across reruns, see imaging.DecoderRegistry)
+    DECODERS = DECODERS
+    # Device pixels available to the upload column; picks the preview sent to the browser
+    PREVIEW_COLUMN_WIDTH = int(os.environ.get("PULMOVISTA_PREVIEW_COLUMN_WIDTH", "720"))
+
+    # Header screening rules applied before any pixel data is read
+    ACCEPTED_MODALITIES = tuple(
+        m.strip().upper() for m in os.environ.get("PULMOVISTA_ACCEPTED_MODALITIES", "CR,DX").split(",") if m.strip()
+    )
+    ACCEPTED_BODY_PARTS = tuple(
+        b.strip().upper() for b in os.environ.get("PULMOVISTA_ACCEPTED_BODY_PARTS", "CHEST,THORAX").split(",")
+        if b.strip()
+    )
+    MAX_MATRIX = int(os.environ.get("PULMOVISTA_MAX_MATRIX", "5000"))
+    # Elements larger than this (i.e. Pixel Data) are only read from the file when accessed
+    DEFER_SIZE = "64 KB"
+
+    @staticmethod
+    def stage_done(progress, stage, start_time):
+        """Report a finished pipeline stage with its measured duration"""
+        now = time.perf_counter()
+        if progress is not None:
+            progress(stage, now - start_time)
+        return now
+
+    @staticmethod
+    def load(uploaded_file, progress=None, previews=True, dicom=None):
+        """Read an upload into a DecodedImage, raising on failure; safe to call from worker threads"""
+        timings = {}
+
+        def record(stage, seconds):
+            timings[stage] = seconds
+            if progress is not None:
+                progress(stage, seconds)
+
+        # Check if it's a DICOM file
+        if dicom is None:
+            dicom = uploaded_file.name.lower().endswith('.dcm') or uploaded_file.type == 'application/octet-stream'
+        if dicom:
+            image, info, dataset = ImageProcessor.load_dicom_image(uploaded_file, record)
+        else:
+            # Handle standard image formats
+            image, info, dataset = ImageProcessor.load_standard_image(uploaded_file, record)
+
+        start_time = time.perf_counter()
+        model_input = preprocess(image)
+        ImageProcessor.stage_done(record, 'resize', start_time)
+        frames = info.get('frames', 1)
+        return DecodedImage(image, model_input, info, build_previews(image) if previews else {}, frames,
+                            dataset if frames > 1 else None, timings)
+
+    @staticmethod
+    def read_dicom_header(source):
+        """Parse only the DICOM header; the pixel data is never read"""
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pydicom.dcmread(source, stop_before_pixels=True)
+
+    @staticmethod
+    def check_header(dicom_data):
+        """Raise ImageRejected if the header rules the study out for analysis"""
+        modality = str(getattr(dicom_data, 'Modality', '')).upper()
+        if modality not in ImageProcessor.ACCEPTED_MODALITIES:
+            raise ImageRejected(f"Unsupported modality '{modality or 'missing'}' "
+                                f"(expected {', '.join(ImageProcessor.ACCEPTED_MODALITIES)})")
+
+        # Many radiographs omit BodyPartExamined, so only reject an explicit mismatch
+        body_part = str(getattr(dicom_data, 'BodyPartExamined', '')).upper()
+        if body_part and body_part not in ImageProcessor.ACCEPTED_BODY_PARTS:
+            raise ImageRejected(f"Unsupported body part '{body_part}' "
+                                f"(expected {', '.join(ImageProcessor.ACCEPTED_BODY_PARTS)})")
+
+        rows = int(getattr(dicom_data, 'Rows', 0) or 0)
+        columns = int(getattr(dicom_data, 'Columns', 0) or 0)
+        if rows > ImageProcessor.MAX_MATRIX or columns > ImageProcessor.MAX_MATRIX:
+            raise ImageRejected(f"Image matrix {rows}x{columns} exceeds the "
+                                f"{ImageProcessor.MAX_MATRIX}x{ImageProcessor.MAX_MATRIX} limit")
+
+    @staticmethod
+    def screen_dicom(source):
+        """Header-only check for batch ingest: returns the header dataset or raises ImageRejected"""
+        dicom_data = ImageProcessor.read_dicom_header(source)
+        ImageProcessor.check_header(dicom_data)
+        return dicom_data
+
+    @staticmethod
+    def is_archive(uploaded_file):
+        """True for uploads that hold several studies (ZIP archives, including zipped DICOMDIR folders)"""
+        return uploaded_file.name.lower().endswith('.zip')
+
+    @staticmethod
+    def batch_sources(uploaded_files):
+        """Uploads with every archive expanded into its entries; nothing is decompressed yet"""
+        sources = []
+        for uploaded_file in uploaded_files:
+            if ImageProcessor.is_archive(uploaded_file):
+                sources.extend(list_entries(uploaded_file, label=uploaded_file.name))
+            else:
+                sources.append(uploaded_file)
+        return sources
+
+    @staticmethod
+    def load_entry(entry, progress=None, previews=False):
+        """Screen an archive entry by its header straight from the stream, then decode it like an upload.
+
+        Rejected and non-DICOM entries are never spooled to disk.
+        """
+        with entry.open() as stream:
+            try:
+                ImageProcessor.screen_dicom(stream)
+            except pydicom.errors.InvalidDicomError as e:
+                raise NotDicomEntry(f"{entry.name} is not a DICOM file") from e
+            return ImageProcessor.load(stream, progress, previews=previews, dicom=True)
+
+    @staticmethod
+    def load_dicom_image(uploaded_file, progress=None):
+        """Load and process DICOM files"""
+        if not DICOM_AVAILABLE:
+            raise ImageLoadError("DICOM support not available. Please install pydicom: pip install pydicom")
+
+        try:
+            start_time = time.perf_counter()
+
+            # Spool the upload to a temp file and parse the header only; uncompressed pixel data is
+            # memory-mapped from there rather than read into memory. Reject unsuitable studies early.
+            dicom_data = read_spooled_dicom(uploaded_file, defer_size=ImageProcessor.DEFER_SIZE)
+            ImageProcessor.check_header(dicom_data)
+
+            # Extract pixel array with the fastest installed decoder for its transfer syntax. Multi-frame
+            # studies only decode their middle frame for display; analysis streams the rest frame by frame.
+            frames = num_frames(dicom_data)
+            pixel_array = ImageProcessor.DECODERS.decode(dicom_data, index=frames // 2 if frames > 1 else None)
+            start_time = ImageProcessor.stage_done(progress, 'decode', start_time)
+
+            # Window and normalize to 0-255 with one cached lookup table, inverting MONOCHROME1 on the way.
+            # Keep the single grey plane; the model input adds channels only at inference time.
+            pil_image = ImageProcessor.frame_to_image(pixel_array, dicom_data)
+            ImageProcessor.stage_done(progress, 'voi', start_time)
+
+            return pil_image, ImageProcessor.get_image_info(dicom_data=dicom_data), dicom_data
+
+        except ImageRejected:
+            raise
+
+        except Exception as e:
+            raise ImageLoadError(f"Error processing DICOM file: {str(e)}") from e
+
+    @staticmethod
+    def frame_to_image(frame, dicom_data):
+        """Window and normalize one decoded frame into a grey PIL image"""
+        invert = getattr(dicom_data, 'PhotometricInterpretation', None) == "MONOCHROME1"
+        return Image.fromarray(window_to_uint8(frame, dicom_data, invert=invert))
+
+    @staticmethod
+    def load_standard_image(uploaded_file, progress=None):
+        """Load standard image formats"""
+        try:
+            start_time = time.perf_counter()
+
+            # Reset file pointer
+            uploaded_file.seek(0)
+
+            # Open with PIL
+            image = Image.open(uploaded_file)
+            info = ImageProcessor.get_image_info(image=image)
+
+            # Chest X-rays are single-channel; keep one grey plane
+            if image.mode != 'L':
+                image = image.convert('L')
+            ImageProcessor.stage_done(progress, 'decode', start_time)
+
+            return image, info, None
+
+        except Exception as e:
+            raise ImageLoadError(f"Error loading standard image: {str(e)}") from e
+
+    @staticmethod
+    def get_image_info(dicom_data=None, image=None):
+        """Extract image information from an already parsed DICOM dataset or opened PIL image"""
+        info = {}
+
+        if dicom_data is not None:
+            # DICOM specific information, as plain values so the dataset can be released
+            pixel_spacing = getattr(dicom_data, 'PixelSpacing', None)
+            info.update({
+                'patient_id': str(getattr(dicom_data, 'PatientID', '')) or None,
+                'modality': str(getattr(dicom_data, 'Modality', 'Unknown')),
+                'body_part': str(getattr(dicom_data, 'BodyPartExamined', 'Unknown')),
+                'study_date': str(getattr(dicom_data, 'StudyDate', 'Unknown')),
+                'institution': str(getattr(dicom_data, 'InstitutionName', 'Unknown')),
+                'manufacturer': str(getattr(dicom_data, 'Manufacturer', 'Unknown')),
+                'frames': num_frames(dicom_data),
+                'rows': int(getattr(dicom_data, 'Rows', 0)) or 'Unknown',
+                'columns': int(getattr(dicom_data, 'Columns', 0)) or 'Unknown',
+                'pixel_spacing': [float(v) for v in pixel_spacing] if pixel_spacing else 'Unknown'
+            })
+        elif image is not None:
+            # Standard image information
+            info.update({
+                'dimensions': f"{image.size[0]}x{image.size[1]}",
+                'mode': image.mode,
+                'format': image.format
+            })
+
+        return info
+
+
+def build_report(probabilities, info=None, processing_time=0.0, frames=1):
+    """Turn per-class probabilities into the report data shown on the Home page and written by score_studies"""
+    labels = class_names(len(probabilities))
+    prediction = int(np.argmax(probabilities))
+    confidence_score = round(float(probabilities[prediction]) * 100, 1)
+    probability_text = ", ".join(
+        f"{label}: {float(p) * 100:.1f}%" for label, p in zip(labels, probabilities)
+    )
+
+    # Risk reflects how certain the model is, not the clinical severity
+    if confidence_score >= 90:
+        risk_score = 'Low'
+    elif confidence_score >= 70:
+        risk_score = 'Medium'
+    else:
+        risk_score = 'High'
+
+    patient_id = (info or {}).get('patient_id')
+    frame_text = f" Averaged over {frames} frames." if frames > 1 else ""
+
+    return {
+        'patient_id': str(patient_id) if patient_id else f'PT-{datetime.now().strftime("%Y%m%d")}-{uuid.uuid4().hex[:4].upper()}',
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'findings': f"Model prediction: {labels[prediction]} ({confidence_score}% confidence). Class probabilities: {probability_text}.{frame_text}",
+        'impression': f"AI classification: {labels[prediction]}.",
+        'prediction': labels[prediction],
+        'probabilities': {label: round(float(p), 4) for label, p in zip(labels, probabilities)},
+        'confidence': f'{confidence_score}%',
+        'processing_time': f'{processing_time:.1f} seconds',
+        'ai_model': MODEL_VERSION,
+        'risk_score': risk_score,
+        'recommendations': 'Continue routine monitoring as clinically indicated.'
+    }
+
+
+class StudyAnalysis:
+    """Prediction cache lookup, inference and report data for one decoded study.
+
+    The Home page, analysis jobs, the HTTP API and the C-STORE receiver all
+    analyze a decoded study through this class::
+
+        analysis = StudyAnalysis(decoded, cache)       # looks the study up in the cache
+        future = analysis.submit(engine)               # probabilities, queued on the engine unless cached
+        report = analysis.report(future.result())      # report data; the probabilities are cached after a miss
+
+    The cache holds probabilities only. Every report, including one for a
+    cache hit, is built from this study's own header, so a repeat of the same
+    pixels never carries over another study's patient details.
+
+    A single image is queued on the engine and submit() returns at once. The
+    frames of a multi-frame study are streamed through the engine one at a
+    time and their probabilities averaged, on ``executor`` if one is given
+    and otherwise in the calling thread.
+    """
+
+    def __init__(self, decoded, cache=None, started_at=None):
+        self.decoded = decoded
+        self.cache = cache
+        # Processing time in the report counts from here unless the caller started the clock earlier
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.key = content_key(decoded.content_pixels(), MODEL_VERSION) if cache is not None else None
+        # Probabilities found in the cache, or None on a miss
+        self.cached = cache.get(self.key) if cache is not None else None
+
+    @property
+    def hit(self):
+        return self.cached is not None
+
+    def submit(self, engine, executor=None, progress=None):
+        """Future of the study's probabilities; ``progress`` is called with the number of frames finished"""
+        if self.hit:
+            future = Future()
+            future.set_result(self.cached)
+            return future
+        if self.decoded.frames <= 1:
+            return engine.submit(self.decoded.model_input)
+        if executor is not None:
+            return executor.submit(predict_stream, engine, self.decoded.frame_inputs(), progress=progress)
+        future = Future()
+        try:
+            future.set_result(predict_stream(engine, self.decoded.frame_inputs(), progress=progress))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def report(self, probabilities=None):
+        """Report data for the study from its probabilities (the cached ones on a hit), caching them after a miss"""
+        if self.hit:
+            probabilities = self.cached
+        report = build_report(probabilities, self.decoded.info, time.perf_counter() - self.started_at,
+                              self.decoded.frames)
+        if self.hit:
+            report['processing_time'] += ' (cached)'
+        elif self.cache is not None:
+            self.cache.put(self.key, probabilities)
+        return report
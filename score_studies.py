@@ -0,0 +1,290 @@
+import argparse
+import collections
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from imaging import SPOOL_DIR, remove_quietly
+from inference import MODEL_VERSION, create_engine
+from ingest import list_entries
+from pipeline import parallel_map, prefetch
+from processing import ImageProcessor, ImageRejected, NotDicomEntry, build_report
+
+# Per-stage timings written for every study, in milliseconds
+STAGES = ('decode', 'voi', 'resize', 'frames', 'load', 'predict', 'total')
+CSV_FIELDS = ('file', 'status', 'error', 'patient_id', 'prediction', 'confidence', 'risk_score', 'probabilities',
+              'frames', 'model') + tuple(f"{stage}_ms" for stage in STAGES)
+# Model batches stacked ahead of the engine, so decode and batching overlap inference
+PREFETCH_BATCHES = 2
+
+
+def spool_frames(decoded):
+    """Preprocess every frame of a multi-frame study into a spool file, one frame at a time; returns its path"""
+    fd, path = tempfile.mkstemp(prefix="frames-", suffix=".raw", dir=SPOOL_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as spool:
+            for model_input in decoded.frame_inputs():
+                spool.write(np.ascontiguousarray(model_input, dtype=decoded.model_input.dtype).tobytes())
+    except BaseException:
+        remove_quietly(path)
+        raise
+    return path
+
+
+def decode_study(entry):
+    """Screen, decode and preprocess one study in a worker process; returns its model inputs and timings.
+
+    A multi-frame study's inputs are spooled to a file instead (``inputs_path``)
+    and read back a batch at a time by model_batches(), so neither process
+    holds all of its frames and only the path is sent back.
+    """
+    # Wall clock, unlike perf_counter, is comparable with the parent process
+    started_at = time.time()
+    start_time = time.perf_counter()
+    timings = {}
+
+    def progress(stage, seconds):
+        timings[stage] = round(seconds * 1000, 1)
+
+    try:
+        decoded = ImageProcessor.load_entry(entry, progress)
+        if decoded.frames > 1:
+            # Every frame is scored and averaged, as in the app
+            frames_start = time.perf_counter()
+            inputs = {'inputs_path': spool_frames(decoded), 'input_shape': decoded.model_input.shape,
+                      'input_dtype': decoded.model_input.dtype.str}
+            ImageProcessor.stage_done(progress, 'frames', frames_start)
+        else:
+            inputs = {'inputs': decoded.model_input[np.newaxis]}
+    except NotDicomEntry as e:
+        return {'file': entry.name, 'status': 'not_dicom', 'error': str(e), 'started_at': started_at}
+    except ImageRejected as e:
+        return {'file': entry.name, 'status': 'skipped', 'error': str(e), 'started_at': started_at}
+    except Exception as e:
+        return {'file': entry.name, 'status': 'failed', 'error': str(e), 'started_at': started_at}
+    ImageProcessor.stage_done(progress, 'load', start_time)
+    return dict(inputs, file=entry.name, status='decoded', frames=decoded.frames, info=decoded.info, timings=timings,
+                started_at=started_at)
+
+
+def study_inputs(study):
+    """Yield a decoded study's model inputs, reading spooled frames one at a time and removing the spool file"""
+    path = study.pop('inputs_path', None)
+    if path is None:
+        yield from study.pop('inputs')
+        return
+    shape, dtype = study.pop('input_shape'), np.dtype(study.pop('input_dtype'))
+    frame_bytes = int(np.prod(shape)) * dtype.itemsize
+    try:
+        with open(path, 'rb') as spool:
+            for _ in range(study['frames']):
+                yield np.frombuffer(spool.read(frame_bytes), dtype=dtype).reshape(shape)
+    finally:
+        remove_quietly(path)
+
+
+def model_batches(studies, batch_size):
+    """Stack the frames of decoded studies into (inputs, owners, passengers) batches of ``batch_size`` images.
+
+    ``owners`` names the study of each input row; a multi-frame study can
+    span batches, and only the frames of the batch being stacked are read. ``passengers`` are studies with nothing to predict
+    (skipped, failed, not DICOM) that rode along since the previous batch.
+    Only the last batch is short.
+    """
+    rows, owners, passengers = [], [], []
+    for study in studies:
+        if study['status'] != 'decoded':
+            passengers.append(study)
+        else:
+            for model_input in study_inputs(study):
+                rows.append(model_input)
+                owners.append(study)
+                if len(rows) == batch_size:
+                    yield np.stack(rows), owners, passengers
+                    rows, owners, passengers = [], [], []
+        if len(passengers) >= batch_size:
+            yield None, [], passengers
+            passengers = []
+    if rows or passengers:
+        yield (np.stack(rows) if rows else None), owners, passengers
+
+
+def study_record(study, probabilities=None, error=None):
+    """One output record; ``study`` is what decode_study() returned"""
+    record = {'file': study['file'], 'status': study['status'], 'error': study.get('error') or error,
+              'model': MODEL_VERSION}
+    if probabilities is not None:
+        frames = study['frames']
+        report = build_report(probabilities, study['info'], frames=frames)
+        record.update({
+            'status': 'analyzed',
+            'patient_id': study['info'].get('patient_id'),
+            'prediction': report['prediction'],
+            'confidence': float(report['confidence'].rstrip('%')),
+            'risk_score': report['risk_score'],
+            'probabilities': report['probabilities'],
+            'frames': frames
+        })
+    elif error is not None:
+        record['status'] = 'failed'
+    record['timings_ms'] = study.get('timings', {})
+    return record
+
+
+class ResultWriter:
+    """Appends records to a JSONL or CSV file that doubles as the resume checkpoint"""
+
+    def __init__(self, path, sync_every=100):
+        self.path = path
+        self.csv = path.lower().endswith('.csv')
+        self.sync_every = sync_every
+        self.done = self._recover()
+        self._unsynced = 0
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='' if self.csv else None, encoding='utf-8')
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, CSV_FIELDS, extrasaction='ignore')
+            if new_file:
+                self._writer.writeheader()
+
+    def _recover(self):
+        """Names already recorded; a record cut off by a crash is truncated so it is redone"""
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                f.truncate(complete)
+        lines = data[:complete].decode('utf-8').splitlines()
+        if self.csv:
+            return {row['file'] for row in csv.DictReader(lines)}
+        return {json.loads(line)['file'] for line in lines if line.strip()}
+
+    def write(self, record):
+        if self.csv:
+            row = dict(record, probabilities=json.dumps(record.get('probabilities')) if 'probabilities' in record
+                       else None)
+            row.update({f"{stage}_ms": ms for stage, ms in record['timings_ms'].items()})
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+def score(entries, writer, workers, max_in_flight, engine, batch_size=None, prefetch_batches=PREFETCH_BATCHES,
+          report_every=100):
+    """Decode ``entries`` on a process pool and score them on ``engine``, writing a record per study.
+
+    Up to ``max_in_flight`` studies decode at once. Their frames are stacked
+    into batches of ``batch_size`` images (default: the engine's batch size)
+    on a prefetch thread, ``prefetch_batches`` ahead, and each batch is
+    submitted whole while the previous one runs, so the model is not left
+    waiting between batches.
+    """
+    batch_size = batch_size or getattr(engine, 'max_batch_size', 1)
+    written = 0
+    start_time = time.perf_counter()
+
+    def record(study, probabilities=None, error=None):
+        nonlocal written
+        if study.get('submitted_at') is not None:
+            study['timings']['predict'] = round((time.perf_counter() - study['submitted_at']) * 1000, 1)
+        study.setdefault('timings', {})['total'] = round((time.time() - study.pop('started_at')) * 1000, 1)
+        writer.write(study_record(study, probabilities, error))
+        written += 1
+        if written % report_every == 0:
+            print(f"{written} studies, {written / (time.perf_counter() - start_time):.1f} studies/s", file=sys.stderr)
+
+    def collect(futures, owners):
+        """Wait for one submitted batch; a study is recorded once all of its frames are predicted"""
+        for future, study in zip(futures, owners):
+            try:
+                probabilities = future.result()
+                study['total'] = study.get('total', 0) + np.asarray(probabilities, dtype=np.float64)
+            except Exception as e:
+                study['error'] = str(e)
+            study['remaining'] = study.get('remaining', study['frames']) - 1
+            if study['remaining'] == 0:
+                if 'error' in study:
+                    record(study, error=study['error'])
+                else:
+                    record(study, (study['total'] / study['frames']).astype(np.float32))
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        studies = parallel_map(decode_study, entries, pool, max_in_flight)
+        # Batches submitted to the engine and not yet collected
+        submitted = collections.deque()
+        for inputs, owners, passengers in prefetch(model_batches(studies, batch_size), prefetch_batches):
+            for study in passengers:
+                record(study)
+            if inputs is not None:
+                submitted_at = time.perf_counter()
+                for study in owners:
+                    study.setdefault('submitted_at', submitted_at)
+                submitted.append(([engine.submit(model_input) for model_input in inputs], owners))
+            # Keep the next batch queued on the engine while waiting for this one
+            while len(submitted) > 1:
+                collect(*submitted.popleft())
+        while submitted:
+            collect(*submitted.popleft())
+
+    return written, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score DICOM studies from folders, DICOMDIR sets or ZIP archives without Streamlit",
+        epilog="Records are appended to OUTPUT (JSONL, or CSV if it ends in .csv) as studies finish; rerun the "
+               "same command to resume after an interruption.")
+    parser.add_argument("inputs", nargs="+", help="Folders, DICOMDIR files, ZIP archives or DICOM files")
+    parser.add_argument("--output", required=True, help="Results file, also used as the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Decode worker processes")
+    parser.add_argument("--in-flight", type=int, help="Studies decoding or waiting for the model at once "
+                                                      "(default: four per worker)")
+    parser.add_argument("--batch-size", type=int, help="Images per model batch (default: the engine's batch size)")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_BATCHES,
+                        help="Batches prepared ahead of the model; 0 prepares them in the main thread")
+    parser.add_argument("--sync-every", type=int, default=100, help="fsync the results every N records")
+    args = parser.parse_args()
+
+    entries = [entry for source in args.inputs for entry in list_entries(source, label=source)]
+    writer = ResultWriter(args.output, args.sync_every)
+    pending = [entry for entry in entries if entry.name not in writer.done]
+    print(f"{len(entries)} files, {len(entries) - len(pending)} already in {args.output}", file=sys.stderr)
+    if not pending:
+        writer.close()
+        return
+
+    engine = create_engine()
+    try:
+        written, seconds = score(pending, writer, args.workers, args.in_flight or 4 * args.workers, engine,
+                                 batch_size=args.batch_size, prefetch_batches=args.prefetch)
+    finally:
+        writer.close()
+        engine.close()
+    print(f"Scored {written} files in {seconds:.1f} s ({written / max(seconds, 1e-6):.1f} studies/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
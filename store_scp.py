@@ -0,0 +1,286 @@
+"""DICOM C-STORE receiver for modalities that can only push over DIMSE (requires pynetdicom).
+
+Incoming instances are written to disk by pynetdicom as they arrive (its
+chunked receive mode, so the network layer never decodes or buffers a
+dataset), moved into the spool and handed to a bounded queue. Worker
+threads screen each header, decode the pixels and submit them to the shared
+batching engine, so instances from every association are micro-batched
+together. While the queue is full a C-STORE waits for room, which stalls
+that association and lets TCP slow the sender down; after
+PULMOVISTA_SCP_QUEUE_TIMEOUT seconds it is answered with Out of Resources
+(0xA700) so the modality retries later.
+
+Predictions go to the prediction cache, so a study opened on the Home page
+afterwards is answered at once, and reports go to ``on_result`` (the CLI
+appends them to a JSONL or CSV file).
+
+Run it standalone with ``python store_scp.py [--port 11112] [--output results.jsonl]``,
+or set PULMOVISTA_SCP_PORT to have the Streamlit app receive from its own
+process, sharing one model, batcher and cache between the UI and the receiver.
+"""
+import argparse
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from pynetdicom import AE, ALL_TRANSFER_SYNTAXES, StoragePresentationContexts, _config, evt
+from pynetdicom.sop_class import Verification
+
+from imaging import DECODE_THREADS, SPOOL_DIR, remove_quietly
+from inference import MAX_BATCH_SIZE, create_engine
+from prediction_cache import PredictionCache
+from processing import ImageProcessor, ImageRejected, StudyAnalysis
+
+# Modalities push from other hosts, so the receiver listens on every interface unless told otherwise
+SCP_HOST = os.environ.get("PULMOVISTA_SCP_HOST", "0.0.0.0")
+# Port the Streamlit app receives on; unset or 0 leaves it off
+SCP_PORT = int(os.environ.get("PULMOVISTA_SCP_PORT", "0") or 0)
+SCP_AE_TITLE = os.environ.get("PULMOVISTA_SCP_AE_TITLE", "PULMOVISTA")
+# Calling AE titles allowed to associate, comma separated; empty accepts any
+ALLOWED_AE_TITLES = tuple(title.strip() for title in os.environ.get("PULMOVISTA_SCP_ALLOWED_AES", "").split(",")
+                          if title.strip())
+MAX_ASSOCIATIONS = int(os.environ.get("PULMOVISTA_SCP_MAX_ASSOCIATIONS", "10"))
+# Received instances waiting to be decoded; a C-STORE waits while the queue is full
+STORE_QUEUE_SIZE = int(os.environ.get("PULMOVISTA_SCP_QUEUE_SIZE", "64"))
+# Well under the DIMSE timeouts of typical SCUs (30 s or more), so a modality gets Out of Resources and
+# retries instead of timing out and aborting the association
+STORE_QUEUE_TIMEOUT = float(os.environ.get("PULMOVISTA_SCP_QUEUE_TIMEOUT", "10"))
+# Decoded instances waiting for the engine; enough to keep its batches full without holding every image
+PREDICTIONS_IN_FLIGHT = 4 * MAX_BATCH_SIZE
+# Analysis results kept by SOP Instance UID
+RESULT_ENTRIES = int(os.environ.get("PULMOVISTA_SCP_RESULT_ENTRIES", "10000"))
+# C-STORE response statuses (PS3.4 B.2.3)
+STATUS_SUCCESS = 0x0000
+STATUS_OUT_OF_RESOURCES = 0xA700
+
+# Have pynetdicom write each received dataset to a temp file as it arrives instead of decoding it in memory.
+# This is a process-wide pynetdicom setting, not one per AE: it is set once here, and every C-STORE SCP in a
+# process that imports this module receives to files (handlers read event.dataset_path, not event.dataset).
+_config.STORE_RECV_CHUNKED_DATASET = True
+
+
+class StoreQueue:
+    """Spooled instances analyzed by worker threads, with results kept by SOP Instance UID.
+
+    Decode workers submit to the engine without waiting for it; a single
+    collector thread turns predictions into reports, in queue order, so
+    ``on_result`` is never called concurrently.
+    """
+
+    def __init__(self, engine, cache=None, maxsize=STORE_QUEUE_SIZE, workers=DECODE_THREADS,
+                 in_flight=PREDICTIONS_IN_FLIGHT, result_entries=RESULT_ENTRIES, on_result=None):
+        self.engine = engine
+        self.cache = cache
+        self.result_entries = result_entries
+        self.on_result = on_result
+        self.results = OrderedDict()
+        self.high_water = 0
+        self.queue = queue.Queue(maxsize)
+        self._completed = queue.SimpleQueue()
+        self._in_flight = threading.BoundedSemaphore(in_flight)
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, name=f"store-decode-{i}", daemon=True)
+                         for i in range(workers)]
+        self._collector = threading.Thread(target=self._collect, name="store-results", daemon=True)
+        for thread in self._workers + [self._collector]:
+            thread.start()
+
+    def put(self, sop_instance_uid, path, timeout=STORE_QUEUE_TIMEOUT):
+        """Queue a spooled instance, waiting up to ``timeout`` seconds for room; False if it stayed full.
+
+        Once queued, the queue removes the file when the instance is done.
+        """
+        try:
+            self.queue.put((sop_instance_uid, path), timeout=timeout)
+        except queue.Full:
+            return False
+        self._record(sop_instance_uid, {'status': 'queued'})
+        self.high_water = max(self.high_water, self.queue.qsize())
+        return True
+
+    def get(self, sop_instance_uid):
+        return self.results.get(sop_instance_uid)
+
+    def join(self):
+        """Wait until every queued instance has a result"""
+        self.queue.join()
+
+    def close(self):
+        """Finish the queued instances and stop the threads"""
+        for _ in self._workers:
+            self.queue.put(None)
+        for thread in self._workers:
+            thread.join()
+        self._completed.put(None)
+        self._collector.join()
+
+    def _record(self, sop_instance_uid, result):
+        with self._lock:
+            self.results[sop_instance_uid] = dict(result, sop_instance_uid=sop_instance_uid)
+            self.results.move_to_end(sop_instance_uid)
+            while len(self.results) > self.result_entries:
+                self.results.popitem(last=False)
+
+    def _submit(self, path):
+        """Decode one instance and submit it to the engine; returns a cached report or a pending prediction"""
+        start_time = time.perf_counter()
+        decoded = ImageProcessor.load(path, previews=False, dicom=True)
+        analysis = StudyAnalysis(decoded, self.cache, start_time)
+        if analysis.hit:
+            return {'status': 'done', 'report': analysis.report()}
+
+        self._in_flight.acquire()
+        try:
+            # A multi-frame study streams its frames through the engine in this worker
+            future = analysis.submit(self.engine)
+        except Exception:
+            self._in_flight.release()
+            raise
+        return future, analysis
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            sop_instance_uid, path = item
+            try:
+                outcome = self._submit(path)
+            except ImageRejected as e:
+                outcome = {'status': 'skipped', 'error': str(e)}
+            except Exception as e:
+                outcome = {'status': 'failed', 'error': str(e)}
+            self._completed.put((sop_instance_uid, path, outcome))
+
+    def _collect(self):
+        while True:
+            item = self._completed.get()
+            if item is None:
+                return
+            sop_instance_uid, path, outcome = item
+            if isinstance(outcome, tuple):
+                future, analysis = outcome
+                try:
+                    outcome = {'status': 'done', 'report': analysis.report(future.result())}
+                except Exception as e:
+                    outcome = {'status': 'failed', 'error': str(e)}
+                finally:
+                    self._in_flight.release()
+            remove_quietly(path)
+            self._record(sop_instance_uid, outcome)
+            if self.on_result is not None:
+                try:
+                    self.on_result(dict(outcome, sop_instance_uid=sop_instance_uid))
+                except Exception as e:
+                    print(f"Could not record {sop_instance_uid}: {e}", file=sys.stderr)
+            self.queue.task_done()
+
+
+def handle_store(event, store_queue):
+    """EVT_C_STORE handler: move the received file into the spool and queue it, waiting while the queue is full"""
+    fd, path = tempfile.mkstemp(prefix="cstore-", suffix=".dcm", dir=SPOOL_DIR)
+    os.close(fd)
+    try:
+        # pynetdicom removes its own file once the handler returns, so take it over instead of copying
+        shutil.move(event.dataset_path, path)
+    except OSError:
+        remove_quietly(path)
+        return STATUS_OUT_OF_RESOURCES
+    if not store_queue.put(str(event.request.AffectedSOPInstanceUID), path):
+        remove_quietly(path)
+        return STATUS_OUT_OF_RESOURCES
+    return STATUS_SUCCESS
+
+
+class StoreSCP:
+    """A C-STORE listener feeding a StoreQueue on ``engine`` (an InferenceEngine or InferenceWorkerPool)"""
+
+    def __init__(self, engine, cache=None, ae_title=SCP_AE_TITLE, allowed_ae_titles=ALLOWED_AE_TITLES,
+                 on_result=None, **queue_options):
+        self.queue = StoreQueue(engine, cache, on_result=on_result, **queue_options)
+        self.ae = AE(ae_title=ae_title)
+        self.ae.maximum_associations = MAX_ASSOCIATIONS
+        if allowed_ae_titles:
+            self.ae.require_calling_aet = list(allowed_ae_titles)
+        # Compressed transfer syntaxes too: the decoder registry handles them
+        for context in StoragePresentationContexts:
+            self.ae.add_supported_context(context.abstract_syntax, ALL_TRANSFER_SYNTAXES)
+        self.ae.add_supported_context(Verification)
+        self.server = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self, host=SCP_HOST, port=SCP_PORT):
+        """Listen on daemon threads of this process; returns self once the port is bound"""
+        self.server = self.ae.start_server((host, port), block=False,
+                                           evt_handlers=[(evt.EVT_C_STORE, handle_store, [self.queue])])
+        return self
+
+    def stop(self):
+        """Stop accepting associations, then finish the queued instances"""
+        if self.server is not None:
+            self.server.shutdown()
+        self.queue.close()
+
+
+def serve_in_background(engine, cache=None, host=SCP_HOST, port=SCP_PORT, on_result=None):
+    """Run the receiver on daemon threads of this process; returns the started StoreSCP"""
+    return StoreSCP(engine, cache, on_result=on_result).start(host, port)
+
+
+def main():
+    from score_studies import ResultWriter
+
+    parser = argparse.ArgumentParser(description="Receive studies from modalities over DICOM C-STORE and "
+                                                 "analyze them as they arrive")
+    parser.add_argument("--host", default=SCP_HOST)
+    parser.add_argument("--port", type=int, default=SCP_PORT or 11112)
+    parser.add_argument("--ae-title", default=SCP_AE_TITLE)
+    parser.add_argument("--output", help="Append a record per instance to this JSONL (or .csv) file")
+    args = parser.parse_args()
+
+    engine = create_engine()
+    writer = ResultWriter(args.output, sync_every=1) if args.output else None
+
+    def on_result(result):
+        report = result.get('report') or {}
+        record = {'file': result['sop_instance_uid'], 'status': result['status'], 'error': result.get('error'),
+                  'model': MODEL_VERSION, 'timings_ms': {}}
+        if report:
+            record.update({
+                'status': 'analyzed',
+                'patient_id': report.get('patient_id'),
+                'prediction': report['prediction'],
+                'confidence': float(report['confidence'].rstrip('%')),
+                'risk_score': report['risk_score'],
+                'probabilities': report['probabilities']
+            })
+        if writer is not None:
+            writer.write(record)
+        print(f"{record['file']}: {record['status']} {record.get('prediction') or record['error'] or ''}",
+              file=sys.stderr)
+
+    scp = StoreSCP(engine, PredictionCache(), ae_title=args.ae_title, on_result=on_result)
+    scp.start(args.host, args.port)
+    print(f"Receiving as {args.ae_title} on {args.host}:{scp.port}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scp.stop()
+        if writer is not None:
+            writer.close()
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
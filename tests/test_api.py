@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("uvicorn")
+
+from api import MultipartRelatedParser  # noqa: E402
+
+BOUNDARY = b"XyZ-boundary"
+PARTS = [
+    ({'content-type': 'application/dicom'}, b"DICM" + bytes(range(256)) * 3),
+    # Looks like a delimiter, but without the leading CRLF it is body data
+    ({'content-type': 'application/dicom', 'content-location': 'b.dcm'}, b"--XyZ-boundary\r\n--XyZ-boundar"),
+    ({}, b""),
+    ({'content-type': 'application/dicom'}, b"\r\n\r\n--XyZ-boundarZ tail\r\n"),
+]
+
+
+def multipart_body(parts=PARTS):
+    body = b"preamble to ignore\r\n"
+    for index, (headers, data) in enumerate(parts):
+        # Transport padding after a delimiter is allowed
+        body += b"--" + BOUNDARY + (b" \t" if index == 1 else b"") + b"\r\n"
+        body += b"".join(f"{name}: {value}\r\n".encode('latin-1') for name, value in headers.items())
+        body += b"\r\n" + data + b"\r\n"
+    return body + b"--" + BOUNDARY + b"--\r\nepilogue to ignore"
+
+
+def parse(body, chunk_size, directory):
+    parser = MultipartRelatedParser(BOUNDARY, directory=str(directory))
+    parts = []
+    try:
+        for start in range(0, len(body), chunk_size):
+            parts.extend(parser.feed(body[start:start + chunk_size]))
+        parser.close()
+    finally:
+        parser.abort()
+    return parts
+
+
+def read_parts(parts):
+    contents = []
+    for headers, path in parts:
+        with open(path, 'rb') as f:
+            contents.append((headers, f.read()))
+        os.remove(path)
+    return contents
+
+
+def test_parts_survive_every_chunk_size(tmp_path):
+    body = multipart_body()
+    for chunk_size in range(1, len(body) + 1):
+        assert read_parts(parse(body, chunk_size, tmp_path)) == PARTS, f"chunk size {chunk_size}"
+        assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_truncated_body_is_rejected_without_leaking_files(tmp_path, chunk_size):
+    body = multipart_body()
+    closing = body.rindex(b"--" + BOUNDARY + b"--")
+    for cut in range(closing + len(BOUNDARY) + 3):
+        parser = MultipartRelatedParser(BOUNDARY, directory=str(tmp_path))
+        completed = []
+        for start in range(0, cut, chunk_size):
+            completed.extend(parser.feed(body[start:min(start + chunk_size, cut)]))
+        with pytest.raises(ValueError):
+            parser.close()
+        parser.abort()
+        # Completed parts belong to the caller; the part cut off is removed
+        assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for _, path in completed)
+        assert [data for _, data in read_parts(completed)] == [data for _, data in PARTS[:len(completed)]]
+
+
+def test_oversized_part_headers_are_rejected(tmp_path):
+    parser = MultipartRelatedParser(BOUNDARY, directory=str(tmp_path))
+    with pytest.raises(ValueError):
+        parser.feed(b"--" + BOUNDARY + b"\r\nX-Padding: " + b"a" * (64 * 1024))
+    parser.abort()
+    assert not os.listdir(tmp_path)
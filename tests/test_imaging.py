@@ -0,0 +1,130 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+pydicom = pytest.importorskip("pydicom")
+
+from imaging import DECODERS, normalize_to_uint8, read_spooled_dicom, voi_table_key, window_to_uint8  # noqa: E402
+
+
+def write_multiframe(path, frames, size=512):
+    """Uncompressed 12-bit multi-frame study whose frame i is filled with i"""
+    from pydicom.dataset import FileDataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    meta = FileMetaDataset()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.1.1"
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds = FileDataset(None, {}, file_meta=meta, preamble=b"\0" * 128)
+    ds.SOPClassUID, ds.SOPInstanceUID = meta.MediaStorageSOPClassUID, meta.MediaStorageSOPInstanceUID
+    ds.Modality = "DX"
+    ds.Rows = ds.Columns = size
+    ds.NumberOfFrames = frames
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 12, 11, 0
+    ds.PixelData = np.repeat(np.arange(frames, dtype=np.uint16), size * size).tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+def peak_while_iterating(path):
+    ds = read_spooled_dicom(str(path), defer_size=1024)
+    tracemalloc.start()
+    try:
+        for index, frame in DECODERS.iter_frames(ds):
+            assert isinstance(frame, np.memmap)
+            assert frame.shape == (512, 512) and frame[0, 0] == index
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_frames_memory_does_not_grow_with_frame_count(tmp_path):
+    peaks = {}
+    for frames in (8, 64):
+        path = tmp_path / f"{frames}.dcm"
+        write_multiframe(path, frames)
+        peaks[frames] = peak_while_iterating(path)
+    # 64 frames of 512x512x2 bytes are 32 MB; only a frame's worth may ever be resident
+    assert peaks[64] < 2 * 2 ** 20
+    assert peaks[64] < peaks[8] + 2 ** 20
+
+
+def windowed_dataset(bits_stored=12, signed=False, **elements):
+    from pydicom.dataset import Dataset
+
+    ds = Dataset()
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, bits_stored, bits_stored - 1
+    ds.PixelRepresentation = int(signed)
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    for keyword, value in elements.items():
+        setattr(ds, keyword, value)
+    return ds
+
+
+def reference(pixels, ds, invert=False):
+    from pydicom.pixel_data_handlers.util import apply_voi_lut
+
+    return normalize_to_uint8(apply_voi_lut(pixels, ds), invert=invert)
+
+
+def random_pixels(ds, shape=(64, 80)):
+    rng = np.random.default_rng(12)
+    if ds.PixelRepresentation:
+        limit = 1 << (ds.BitsStored - 1)
+        return rng.integers(-limit, limit, shape).astype(np.int16)
+    return rng.integers(0, 1 << ds.BitsStored, shape).astype(np.uint16)
+
+
+@pytest.mark.parametrize("elements", [
+    dict(WindowCenter=1800, WindowWidth=1200),
+    dict(WindowCenter=40, WindowWidth=400, RescaleSlope=1, RescaleIntercept=-1024),
+    dict(WindowCenter=[600, 900], WindowWidth=[300, 500], RescaleSlope=2.5, RescaleIntercept=-100),
+    dict(WindowCenter=2048, WindowWidth=4096, VOILUTFunction="SIGMOID"),
+])
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("invert", [False, True])
+def test_window_to_uint8_matches_apply_voi_lut_and_normalize(elements, signed, invert):
+    ds = windowed_dataset(signed=signed, **elements)
+    pixels = random_pixels(ds)
+    assert voi_table_key(ds, pixels.dtype) is not None
+    expected = reference(pixels, ds, invert)
+    actual = window_to_uint8(pixels, ds, invert=invert)
+    assert actual.dtype == np.uint8 and actual.shape == pixels.shape
+    # The table is windowed in float32, apply_voi_lut in float64: values may round to neighbours
+    assert np.abs(actual.astype(int) - expected).max() <= 1
+
+
+@pytest.mark.parametrize("changed", [
+    dict(RescaleIntercept=-500),
+    dict(RescaleSlope=2),
+    dict(WindowCenter=1000),
+    dict(WindowWidth=800),
+    dict(VOILUTFunction="LINEAR_EXACT"),
+    dict(BitsStored=14, HighBit=13),
+])
+def test_window_tables_are_cached_per_voi_and_rescale(changed):
+    base = windowed_dataset(WindowCenter=1800, WindowWidth=1200, RescaleSlope=1, RescaleIntercept=0)
+    other = windowed_dataset(WindowCenter=1800, WindowWidth=1200, RescaleSlope=1, RescaleIntercept=0)
+    for keyword, value in changed.items():
+        setattr(other, keyword, value)
+    pixels = random_pixels(base)
+    assert voi_table_key(base, pixels.dtype) != voi_table_key(other, pixels.dtype)
+    # Alternate so each call would pick up the other's cached table if the key missed a difference
+    for ds in (base, other, base, other):
+        assert np.abs(window_to_uint8(pixels, ds).astype(int) - reference(pixels, ds)).max() <= 1
+
+
+def test_window_to_uint8_falls_back_without_a_table():
+    from pydicom.dataset import Dataset
+
+    ds = windowed_dataset(WindowCenter=1800, WindowWidth=1200)
+    item = Dataset()
+    item.LUTDescriptor = [4096, 0, 16]
+    item.LUTData = list(range(0, 65536, 16))
+    ds.VOILUTSequence = [item]
+    pixels = random_pixels(ds)
+    assert voi_table_key(ds, pixels.dtype) is None
+    np.testing.assert_array_equal(window_to_uint8(pixels, ds), reference(pixels, ds))
@@ -0,0 +1,114 @@
+import threading
+
+import numpy as np
+import pytest
+
+from inference import IMG_SIZE, MODEL_CHANNELS, InferenceEngine, ServingModel, predict_stream
+
+
+class StubModel:
+    """Records the batch shapes it is called with; the first class scores each image's mean pixel value"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, batch):
+        self.shapes.append(batch.shape)
+        means = batch.reshape(len(batch), -1).mean(axis=1)
+        return np.stack([means, 1 - means], axis=1)
+
+
+def image(value):
+    return np.full((IMG_SIZE, IMG_SIZE), value, dtype=np.float32)
+
+
+def test_concurrent_requests_are_micro_batched_and_padded_to_a_bucket():
+    model = StubModel()
+    engine = InferenceEngine(model, max_batch_size=8, max_wait_ms=500)
+    try:
+        values = [0.1, 0.2, 0.3, 0.4, 0.5]
+        futures = [engine.submit(image(value)) for value in values]
+        results = [future.result(timeout=10) for future in futures]
+    finally:
+        engine.close()
+
+    # Five requests run as one call, padded up to the warmed-up batch size of 8
+    assert model.shapes == [(8, IMG_SIZE, IMG_SIZE)]
+    assert (engine.batches_run, engine.images_run) == (1, 5)
+    for value, probabilities in zip(values, results):
+        np.testing.assert_allclose(probabilities, [value, 1 - value], rtol=1e-6)
+
+
+def test_a_full_batch_runs_without_waiting_for_the_deadline():
+    model = StubModel()
+    engine = InferenceEngine(model, max_batch_size=4, max_wait_ms=60_000)
+    try:
+        futures = [engine.submit(image(0.5)) for _ in range(4)]
+        for future in futures:
+            future.result(timeout=10)
+    finally:
+        engine.close()
+    assert model.shapes == [(4, IMG_SIZE, IMG_SIZE)]
+
+
+def test_model_errors_reach_every_future_of_the_batch():
+    calls = []
+
+    def model(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("out of memory")
+        return np.tile([[2.0, 1.0]], (len(batch), 1))
+
+    engine = InferenceEngine(model, max_batch_size=4, max_wait_ms=500)
+    try:
+        failed = [engine.submit(image(0.5)) for _ in range(4)]
+        for future in failed:
+            with pytest.raises(RuntimeError, match="out of memory"):
+                future.result(timeout=10)
+        # The batcher keeps serving after a failed batch; raw logits come back as a softmax
+        probabilities = engine.predict(image(0.5), timeout=10)
+    finally:
+        engine.close()
+    np.testing.assert_allclose(probabilities, [0.7310586, 0.2689414], rtol=1e-5)
+    assert engine.batches_run == 1
+
+
+def test_predict_stream_averages_every_input_with_a_bounded_number_in_flight():
+    model = StubModel()
+    engine = InferenceEngine(model, max_batch_size=2, max_wait_ms=0)
+    finished = []
+    try:
+        values = np.linspace(0, 1, 7)
+        probabilities = predict_stream(engine, (image(value) for value in values), max_in_flight=3,
+                                       progress=finished.append)
+    finally:
+        engine.close()
+    np.testing.assert_allclose(probabilities, [values.mean(), 1 - values.mean()], rtol=1e-5)
+    assert finished == list(range(1, 8))
+    with pytest.raises(ValueError):
+        predict_stream(InferenceEngine(StubModel()), [])
+
+
+def test_serving_model_is_never_retraced_for_any_batch_size():
+    tf = pytest.importorskip("tensorflow")
+
+    inputs = tf.keras.Input((IMG_SIZE, IMG_SIZE, MODEL_CHANNELS))
+    pooled = tf.keras.layers.GlobalAveragePooling2D()(inputs)
+    model = ServingModel(tf.keras.Model(inputs, tf.keras.layers.Dense(3, activation='softmax')(pooled)))
+    model.warm_up([1, 2, 4, 8])
+
+    engine = InferenceEngine(model, max_batch_size=8, max_wait_ms=50)
+    try:
+        # Batches of every size from 1 to 8, from several threads at once
+        threads = [threading.Thread(target=lambda n=n: [f.result(timeout=30) for f in
+                                                        [engine.submit(image(0.5)) for _ in range(n)]])
+                   for n in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        engine.close()
+    assert engine.images_run == sum(range(1, 9))
+    assert engine.retrace_count == 0
@@ -0,0 +1,116 @@
+import io
+import os
+import pickle
+import zipfile
+
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.sequence import Sequence
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+from ingest import is_archive, list_entries
+
+
+def dicomdir_bytes(*file_ids):
+    """A minimal DICOMDIR whose image records reference ``file_ids``, in order"""
+    dicomdir = Dataset()
+    dicomdir.file_meta = FileMetaDataset()
+    dicomdir.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.1.3.10"
+    dicomdir.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    dicomdir.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    records = [Dataset()]
+    records[0].DirectoryRecordType = "PATIENT"
+    for file_id in file_ids:
+        record = Dataset()
+        record.DirectoryRecordType = "IMAGE"
+        record.ReferencedFileID = file_id.split("/")
+        records.append(record)
+    dicomdir.DirectoryRecordSequence = Sequence(records)
+    buffer = io.BytesIO()
+    dicomdir.save_as(buffer, enforce_file_format=True)
+    return buffer.getvalue()
+
+
+def write_files(root, files):
+    for name, data in files.items():
+        path = os.path.join(root, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def contents(entries):
+    result = {}
+    for entry in entries:
+        with entry.open() as stream:
+            result[entry.name] = stream.read()
+    return result
+
+
+def test_folder_lists_every_file_in_order_and_entries_reopen_in_another_process(tmp_path):
+    write_files(str(tmp_path), {"b.dcm": b"B", "a/2.dcm": b"A2", "a/1.dcm": b"A1"})
+
+    entries = list_entries(str(tmp_path), label="upload")
+    assert contents(entries) == {"upload/a/1.dcm": b"A1", "upload/a/2.dcm": b"A2", "upload/b.dcm": b"B"}
+    assert [entry.size for entry in entries] == [2, 2, 1]
+    assert contents([pickle.loads(pickle.dumps(entry)) for entry in entries]) == contents(entries)
+
+
+def test_zip_skips_folders_and_resource_forks(tmp_path):
+    path = str(tmp_path / "studies.zip")
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("series/", b"")
+        archive.writestr("series/2.dcm", b"second")
+        archive.writestr("series/1.dcm", b"first")
+        archive.writestr("__MACOSX/series/._1.dcm", b"fork")
+
+    assert is_archive(path)
+    entries = list_entries(path)
+    assert contents(entries) == {"series/1.dcm": b"first", "series/2.dcm": b"second"}
+    assert contents([pickle.loads(pickle.dumps(entry)) for entry in entries]) == contents(entries)
+
+    # Listed from an upload: readable here, but there is no path to reopen it elsewhere
+    with open(path, 'rb') as f:
+        upload = io.BytesIO(f.read())
+    upload.name = "studies.zip"
+    assert is_archive(upload)
+    entries = list_entries(upload, label="studies.zip")
+    assert contents(entries) == {"studies.zip/series/1.dcm": b"first", "studies.zip/series/2.dcm": b"second"}
+    with pytest.raises(TypeError):
+        pickle.dumps(entries[0])
+
+
+def test_dicomdir_lists_only_its_records_in_record_order(tmp_path):
+    write_files(str(tmp_path), {
+        "DICOMDIR": dicomdir_bytes("IMAGES/IM2", "IMAGES/IM1", "IMAGES/IM3"),
+        # Extracted on a case-sensitive file system in lower case; not referenced by any record
+        "images/im1": b"1", "images/im2": b"2", "notes.txt": b"not a study",
+    })
+
+    for source in (str(tmp_path), str(tmp_path / "DICOMDIR")):
+        assert is_archive(source)
+        entries = list_entries(source)
+        assert [entry.name for entry in entries] == ["images/im2", "images/im1", "IMAGES/IM3"]
+        assert contents(entries[:2]) == {"images/im2": b"2", "images/im1": b"1"}
+        # A record whose file is missing fails only when that study is read
+        with pytest.raises(FileNotFoundError, match="IMAGES/IM3"):
+            entries[2].open()
+
+
+def test_dicomdir_in_a_zip_subfolder(tmp_path):
+    path = str(tmp_path / "cd.zip")
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr("CD/DICOMDIR", dicomdir_bytes("DICOM/IM1"))
+        archive.writestr("CD/DICOM/IM1", b"1")
+        archive.writestr("CD/README", b"not a study")
+
+    assert contents(list_entries(path, label="cd.zip")) == {"cd.zip/CD/DICOM/IM1": b"1"}
+
+
+def test_a_single_file_is_one_entry(tmp_path):
+    path = str(tmp_path / "chest.dcm")
+    write_files(str(tmp_path), {"chest.dcm": b"DICM"})
+    assert not is_archive(path)
+    entries = list_entries(path, label="chest.dcm")
+    assert contents(entries) == {"chest.dcm": b"DICM"}
+    assert contents([pickle.loads(pickle.dumps(entries[0]))]) == {"chest.dcm": b"DICM"}
@@ -0,0 +1,154 @@
+import io
+import os
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import job_store
+from job_store import MAX_ATTEMPTS, JobRunner, JobStore
+from processing import DecodedImage
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_store.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "jobs"))
+
+
+def submit(store, clock, name, owner=None):
+    clock.now += 1
+    return store.submit(io.BytesIO(name.encode()), name, owner)
+
+
+def test_claim_leases_the_oldest_queued_job(store, clock):
+    first = submit(store, clock, "first.dcm")
+    second = submit(store, clock, "second.dcm")
+    assert store.queued_before(second) == 1
+
+    job = store.claim("runner-a", lease_seconds=60)
+    assert job['id'] == first
+    assert (job['status'], job['attempts'], job['lease_owner']) == ('running', 1, "runner-a")
+    with open(job['path'], 'rb') as f:
+        assert f.read() == b"first.dcm"
+    assert store.claim("runner-b", lease_seconds=60)['id'] == second
+    assert store.claim("runner-c", lease_seconds=60) is None
+    assert store.counts() == {'running': 2}
+
+
+def test_expired_lease_is_claimed_again(store, clock):
+    job_id = submit(store, clock, "study.dcm")
+    job = store.claim("crashed", lease_seconds=60)
+    clock.now += 59
+    assert store.claim("runner-b", lease_seconds=60) is None
+
+    clock.now += 2
+    retried = store.claim("runner-b", lease_seconds=60)
+    assert (retried['id'], retried['attempts'], retried['lease_owner']) == (job_id, 2, "runner-b")
+    # The runner that lost the lease cannot record an outcome any more
+    assert not store.finish(job_id, "crashed", 'done', result={'prediction': "stale"})
+    assert store.finish(job_id, "runner-b", 'done', result={'prediction': "Class 1"})
+    assert store.result(job_id) == {'prediction': "Class 1"}
+    assert not os.path.exists(job['path'])
+
+
+def test_renewed_lease_is_not_claimed(store, clock):
+    submit(store, clock, "study.dcm")
+    store.claim("runner-a", lease_seconds=60)
+    clock.now += 50
+    assert store.renew("runner-a", lease_seconds=60) == 1
+    clock.now += 50
+    assert store.claim("runner-b", lease_seconds=60) is None
+
+
+def test_job_fails_after_max_attempts(store, clock):
+    job_id = submit(store, clock, "poison.dcm")
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        job = store.claim(f"runner-{attempt}", lease_seconds=60)
+        assert job['attempts'] == attempt
+        clock.now += 61
+    assert store.claim("runner-last", lease_seconds=60) is None
+    job = store.get(job_id)
+    assert job['status'] == 'failed' and str(MAX_ATTEMPTS) in job['error']
+    assert not os.path.exists(job['path'])
+
+
+def test_prune_removes_only_jobs_finished_long_ago(store, clock):
+    finished_early = submit(store, clock, "finished-early.dcm")
+    finished_late = submit(store, clock, "finished-late.dcm")
+    store.claim("runner", lease_seconds=60)
+    store.finish(finished_early, "runner", 'done', result={})
+    clock.now += 3600
+    submitted_late = submit(store, clock, "submitted-late.dcm")
+    store.claim("runner", lease_seconds=60)
+    store.finish(finished_late, "runner", 'skipped', error="rejected")
+    queued = submit(store, clock, "queued.dcm")
+
+    # Age counts from when a job finished, and unfinished jobs are never pruned
+    assert store.prune(max_age_seconds=1800) == 1
+    assert store.get(finished_early) is None
+    assert store.get(finished_late)['status'] == 'skipped'
+    assert store.get(submitted_late)['status'] == 'queued'
+    clock.now += 3600
+    assert store.prune(max_age_seconds=1800) == 1
+    assert store.get(queued)['status'] == 'queued'
+
+
+def test_spool_paths_are_absolute(tmp_path, clock, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = JobStore("jobs.sqlite3", "jobs")
+    job = store.get(submit(store, clock, "study.dcm"))
+    assert os.path.isabs(store.path) and os.path.isabs(job['path'])
+
+    # A runner started from another directory still finds the spooled study
+    monkeypatch.chdir(os.path.dirname(tmp_path))
+    with open(store.claim("runner", lease_seconds=60)['path'], 'rb') as f:
+        assert f.read() == b"study.dcm"
+
+
+def test_recent_lists_only_the_owners_jobs(store, clock):
+    mine = [submit(store, clock, f"mine-{i}.dcm", owner="session-a") for i in range(3)]
+    submit(store, clock, "theirs.dcm", owner="session-b")
+    submit(store, clock, "unowned.dcm")
+    assert [job['id'] for job in store.recent("session-a")] == mine[::-1]
+    assert [job['name'] for job in store.recent("session-b")] == ["theirs.dcm"]
+    assert len(store.recent("session-a", limit=2)) == 2
+
+
+class Engine:
+    """Answers every image at once with the same probabilities"""
+
+    def submit(self, model_input):
+        future = Future()
+        future.set_result(np.array([0.2, 0.8], dtype=np.float32))
+        return future
+
+
+def test_handed_over_study_shows_its_measured_decode_timings(store, clock):
+    runner = JobRunner(store, Engine(), workers=1)
+    decoded = DecodedImage(Image.new('L', (8, 8)), np.zeros((8, 8), dtype=np.float32),
+                           timings={'decode': 0.0123, 'voi': 0.004, 'resize': 0.002})
+    clock.now += 1
+    job_id = runner.submit(io.BytesIO(b"study"), "study.dcm", decoded=decoded)
+    runner.run(store.claim(runner.owner))
+
+    job = store.get(job_id)
+    assert job['status'] == 'done'
+    stages = job['progress']['stages']
+    assert {stage: stages[stage] for stage in decoded.timings} == {'decode': 12.3, 'voi': 4.0, 'resize': 2.0}
+    assert 'predict' in stages
@@ -0,0 +1,109 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline import parallel_map, prefetch
+
+
+def test_parallel_map_yields_in_input_order_when_deterministic():
+    def slow_first(item):
+        time.sleep(0.05 * (5 - item))
+        return item * 10
+
+    with ThreadPoolExecutor(4) as executor:
+        assert list(parallel_map(slow_first, range(5), executor, num_parallel=4, deterministic=True)) == \
+            [0, 10, 20, 30, 40]
+
+
+def test_parallel_map_yields_results_as_they_finish_and_pulls_items_lazily():
+    release = threading.Event()
+    pulled = []
+
+    def items():
+        for item in range(4):
+            pulled.append(item)
+            yield item
+
+    def blocked_first(item):
+        if item == 0:
+            assert release.wait(10)
+        return item
+
+    with ThreadPoolExecutor(2) as executor:
+        results = parallel_map(blocked_first, items(), executor, num_parallel=2)
+        # Item 0 is still running, so item 1 comes out first; nothing is pulled until the consumer asks again
+        assert next(results) == 1
+        assert pulled == [0, 1]
+        release.set()
+        assert sorted(results) == [0, 2, 3]
+
+
+@pytest.mark.parametrize("deterministic", [True, False])
+def test_parallel_map_raises_the_first_error_to_the_consumer(deterministic):
+    def fail_on_two(item):
+        if item == 2:
+            raise ValueError("corrupt study")
+        return item
+
+    with ThreadPoolExecutor(2) as executor:
+        results = parallel_map(fail_on_two, range(10), executor, num_parallel=2, deterministic=deterministic)
+        with pytest.raises(ValueError, match="corrupt study"):
+            list(results)
+
+
+def test_prefetch_keeps_order_and_stays_a_bounded_number_of_elements_ahead():
+    produced = []
+
+    def source():
+        for item in range(20):
+            produced.append(item)
+            yield item
+
+    elements = prefetch(source(), buffer_size=2)
+    assert next(elements) == 0
+    time.sleep(0.2)
+    # Two elements buffered, plus one waiting to be put
+    assert len(produced) <= 4
+    assert list(elements) == list(range(1, 20))
+
+
+def test_prefetch_raises_upstream_errors_after_the_elements_before_them():
+    def source():
+        yield 1
+        yield 2
+        raise OSError("archive truncated")
+
+    elements = prefetch(source(), buffer_size=4)
+    assert next(elements) == 1 and next(elements) == 2
+    with pytest.raises(OSError, match="archive truncated"):
+        next(elements)
+
+
+def test_closing_prefetch_stops_and_closes_the_upstream_generator():
+    closed = threading.Event()
+
+    def source():
+        try:
+            for item in range(1000):
+                yield item
+        finally:
+            closed.set()
+
+    elements = prefetch(source(), buffer_size=1)
+    assert next(elements) == 0
+    elements.close()
+    assert closed.is_set()
+
+
+def test_prefetch_without_a_buffer_runs_in_the_callers_thread():
+    threads = []
+
+    def source():
+        for item in range(3):
+            threads.append(threading.current_thread())
+            yield item
+
+    assert list(prefetch(source(), buffer_size=0)) == [0, 1, 2]
+    assert threads == [threading.current_thread()] * 3
@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+
+from prediction_cache import PredictionCache, content_key
+
+
+def test_memory_tier_evicts_the_least_recently_used_prediction():
+    cache = PredictionCache(None, memory_entries=2)
+    cache.put("a", [0.1, 0.9])
+    cache.put("b", [0.2, 0.8])
+    assert cache.get("a") is not None  # "a" is now more recent than "b"
+    cache.put("c", [0.3, 0.7])
+
+    assert cache.get("b") is None
+    np.testing.assert_allclose(cache.get("a"), [0.1, 0.9])
+    np.testing.assert_allclose(cache.get("c"), [0.3, 0.7])
+    assert cache.get("c").dtype == np.float32
+    assert cache.stats() == {'hits': 4, 'misses': 1, 'hit_rate': 0.8, 'memory_entries': 2}
+
+
+def test_disk_tier_serves_other_processes_and_counts_hits_and_misses(tmp_path):
+    PredictionCache(str(tmp_path)).put("key", np.array([[0.25, 0.75]], dtype=np.float32))
+
+    cache = PredictionCache(str(tmp_path))
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'memory_entries': 0}
+    assert cache.get("missing") is None
+    np.testing.assert_allclose(cache.get("key"), [0.25, 0.75])
+    # Read from disk once, then answered by the memory tier
+    os.remove(tmp_path / "key.json")
+    np.testing.assert_allclose(cache.get("key"), [0.25, 0.75])
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+
+def test_disk_tier_evicts_the_least_recently_used_files_past_its_budget(tmp_path):
+    size = len(json.dumps([0.5, 0.5]))
+    cache = PredictionCache(str(tmp_path), memory_entries=0, disk_bytes=size * 3)
+    for age, key in enumerate(["old", "middle", "new"]):
+        cache.put(key, [0.5, 0.5])
+        os.utime(tmp_path / f"{key}.json", (1_000_000 + age, 1_000_000 + age))
+
+    # Reading "old" makes it the most recently used file
+    assert cache.get("old") is not None
+    cache.put("newest", [0.5, 0.5])
+
+    # Over budget: trimmed to 90% of it, least recently used first
+    assert sorted(os.listdir(tmp_path)) == ["newest.json", "old.json"]
+    assert cache._disk_usage == size * 2
+    assert cache.get("middle") is None
+
+
+def test_report_files_from_older_versions_are_misses(tmp_path):
+    with open(tmp_path / "key.json", "w") as f:
+        json.dump({'patient_id': "P1", 'prediction': "Class 1"}, f)
+    assert PredictionCache(str(tmp_path)).get("key") is None
+
+
+def test_content_key_depends_on_pixels_layout_and_model_version():
+    pixels = np.arange(16, dtype=np.float32).reshape(4, 4)
+    key = content_key(pixels, "v1")
+    assert key == content_key(pixels.copy(), "v1")
+    assert key != content_key(pixels, "v2")
+    assert key != content_key(pixels.reshape(2, 8), "v1")
+    assert key != content_key(pixels.astype(np.float64), "v1")
+    assert key == content_key(np.asfortranarray(pixels), "v1")
@@ -0,0 +1,50 @@
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+from prediction_cache import PredictionCache
+from processing import DecodedImage, StudyAnalysis
+
+
+class Engine:
+    """Answers every image at once with the same probabilities and counts the calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, model_input):
+        self.calls += 1
+        future = Future()
+        future.set_result(np.array([0.1, 0.7, 0.2], dtype=np.float32))
+        return future
+
+
+def decoded(patient_id):
+    pixels = np.arange(64, dtype=np.uint8).reshape(8, 8)
+    return DecodedImage(Image.fromarray(pixels), pixels.astype(np.float32) / 255, {'patient_id': patient_id})
+
+
+def analyze(study, engine, cache):
+    analysis = StudyAnalysis(study, cache)
+    return analysis, analysis.report(analysis.submit(engine).result())
+
+
+def test_cache_hit_reports_the_header_of_the_study_being_analyzed(tmp_path):
+    engine = Engine()
+    cache = PredictionCache(str(tmp_path), memory_entries=4)
+
+    first, first_report = analyze(decoded("P1"), engine, cache)
+    second, second_report = analyze(decoded("P2"), engine, cache)
+    assert not first.hit and second.hit
+    assert engine.calls == 1
+    assert first_report['patient_id'] == "P1" and second_report['patient_id'] == "P2"
+    assert second_report['prediction'] == first_report['prediction'] == "Class 1"
+    assert second_report['processing_time'].endswith("seconds (cached)")
+
+    # Without an ID in the header every report gets its own placeholder
+    _, anonymous = analyze(decoded(None), engine, cache)
+    _, again = analyze(decoded(None), engine, PredictionCache(str(tmp_path), memory_entries=4))
+    assert anonymous['patient_id'].startswith("PT-") and again['patient_id'].startswith("PT-")
+    assert anonymous['patient_id'] != again['patient_id']
+    assert engine.calls == 1
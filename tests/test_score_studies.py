@@ -0,0 +1,54 @@
+import csv
+import json
+
+import pytest
+
+from score_studies import ResultWriter, study_record
+
+
+def record(name):
+    study = {'file': name, 'status': 'decoded', 'frames': 1, 'info': {'patient_id': "P1"},
+             'timings': {'decode': 1.5, 'total': 3.0}}
+    return study_record(study, [0.1, 0.7, 0.2])
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv"])
+def test_resume_skips_recorded_studies_and_redoes_a_cut_off_record(tmp_path, suffix):
+    path = str(tmp_path / f"results{suffix}")
+    writer = ResultWriter(path)
+    assert writer.done == set()
+    writer.write(record("a.dcm"))
+    writer.write(record("b.dcm"))
+    writer.close()
+    complete = open(path, 'rb').read()
+
+    # A crash in the middle of the third record leaves a partial last line
+    with open(path, 'ab') as f:
+        f.write(complete.splitlines(keepends=True)[-1][:20])
+
+    writer = ResultWriter(path)
+    assert writer.done == {"a.dcm", "b.dcm"}
+    assert open(path, 'rb').read() == complete
+    writer.write(record("c.dcm"))
+    writer.close()
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if suffix == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f]
+    assert [row['file'] for row in rows] == ["a.dcm", "b.dcm", "c.dcm"]
+    assert ResultWriter(path).done == {"a.dcm", "b.dcm", "c.dcm"}
+
+
+def test_csv_rows_flatten_probabilities_and_stage_timings(tmp_path):
+    path = str(tmp_path / "results.csv")
+    writer = ResultWriter(path)
+    writer.write(record("a.dcm"))
+    writer.close()
+
+    with open(path, newline='', encoding='utf-8') as f:
+        row, = csv.DictReader(f)
+    assert row['status'] == "analyzed" and row['patient_id'] == "P1"
+    assert list(json.loads(row['probabilities']).values()) == pytest.approx([0.1, 0.7, 0.2])
+    assert (row['decode_ms'], row['total_ms'], row['predict_ms']) == ("1.5", "3.0", "")